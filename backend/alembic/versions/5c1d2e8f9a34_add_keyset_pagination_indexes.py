@@ -0,0 +1,45 @@
+"""add keyset pagination indexes
+
+Revision ID: 5c1d2e8f9a34
+Revises: 18355039c70d
+Create Date: 2026-10-16 09:12:04.318522
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1d2e8f9a34"
+down_revision: Union[str, Sequence[str], None] = "18355039c70d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEYSET_INDEXES = {
+    "ix_patients_first_name_id": ["first_name", "id"],
+    "ix_patients_last_name_id": ["last_name", "id"],
+    "ix_patients_date_of_birth_id": ["date_of_birth", "id"],
+    "ix_patients_status_id": ["status", "id"],
+    "ix_patients_last_visit_date_id": ["last_visit_date", "id"],
+    "ix_patients_created_at_id": ["created_at", "id"],
+    "ix_patients_status_last_name_id": ["status", "last_name", "id"],
+    "ix_patients_status_last_visit_date_id": ["status", "last_visit_date", "id"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns in KEYSET_INDEXES.items():
+        op.create_index(name, "patients", columns, unique=False)
+    # ix_patients_status_id leads with status, so it covers every lookup
+    # the single-column index served.
+    op.drop_index("ix_patients_status", table_name="patients")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_patients_status", "patients", ["status"], unique=False)
+    for name in reversed(KEYSET_INDEXES):
+        op.drop_index(name, table_name="patients")
@@ -0,0 +1,54 @@
+"""add trigram search column
+
+Revision ID: 9e4b7a1c2d50
+Revises: 5c1d2e8f9a34
+Create Date: 2026-10-16 10:03:47.902115
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4b7a1c2d50"
+down_revision: Union[str, Sequence[str], None] = "5c1d2e8f9a34"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "patients",
+        sa.Column(
+            "search_text",
+            sa.Text(),
+            sa.Computed(
+                "first_name || ' ' || last_name || ' ' || email", persisted=True
+            ),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_patients_search_text_trgm",
+        "patients",
+        ["search_text"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_patients_search_text_trgm",
+        table_name="patients",
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+    op.drop_column("patients", "search_text")
@@ -0,0 +1,90 @@
+"""add per-patient note versions maintained by triggers
+
+The notes ETag no longer aggregates created_at, so the keyset index drops
+its INCLUDE column.
+
+Revision ID: a7c3e91d5f24
+Revises: f3a9d6b2c418
+Create Date: 2026-10-16 23:41:07.215390
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e91d5f24"
+down_revision: Union[str, Sequence[str], None] = "f3a9d6b2c418"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "note_versions",
+        sa.Column("patient_id", sa.UUID(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["patient_id"], ["patients.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("patient_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO note_versions (patient_id, version)
+        SELECT patient_id, count(*) FROM notes GROUP BY patient_id
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_note_versions() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO note_versions (patient_id, version)
+            SELECT changed.patient_id, count(*)
+            FROM changed_notes AS changed
+            JOIN patients ON patients.id = changed.patient_id
+            GROUP BY changed.patient_id
+            ORDER BY changed.patient_id
+            ON CONFLICT (patient_id)
+            DO UPDATE SET version = note_versions.version + excluded.version;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER notes_bump_note_versions_insert "
+        "AFTER INSERT ON notes REFERENCING NEW TABLE AS changed_notes "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_note_versions()"
+    )
+    op.execute(
+        "CREATE TRIGGER notes_bump_note_versions_delete "
+        "AFTER DELETE ON notes REFERENCING OLD TABLE AS changed_notes "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_note_versions()"
+    )
+    op.drop_index("ix_notes_patient_id_timestamp_id", table_name="notes")
+    op.create_index(
+        "ix_notes_patient_id_timestamp_id",
+        "notes",
+        ["patient_id", sa.text("timestamp DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER notes_bump_note_versions_delete ON notes")
+    op.execute("DROP TRIGGER notes_bump_note_versions_insert ON notes")
+    op.execute("DROP FUNCTION bump_note_versions()")
+    op.drop_table("note_versions")
+    op.drop_index("ix_notes_patient_id_timestamp_id", table_name="notes")
+    op.create_index(
+        "ix_notes_patient_id_timestamp_id",
+        "notes",
+        ["patient_id", sa.text("timestamp DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_include=["created_at"],
+    )
@@ -0,0 +1,46 @@
+"""add notes full text search
+
+Revision ID: b2f6c3d8e71a
+Revises: 9e4b7a1c2d50
+Create Date: 2026-10-16 11:21:09.447630
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b2f6c3d8e71a"
+down_revision: Union[str, Sequence[str], None] = "9e4b7a1c2d50"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notes",
+        sa.Column(
+            "content_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', content)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_notes_content_tsv",
+        "notes",
+        ["content_tsv"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_content_tsv", table_name="notes", postgresql_using="gin")
+    op.drop_column("notes", "content_tsv")
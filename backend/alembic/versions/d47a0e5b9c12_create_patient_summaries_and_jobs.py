@@ -0,0 +1,59 @@
+"""create patient summaries and summary jobs tables
+
+Revision ID: d47a0e5b9c12
+Revises: b2f6c3d8e71a
+Create Date: 2026-10-16 14:37:52.118094
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d47a0e5b9c12"
+down_revision: Union[str, Sequence[str], None] = "b2f6c3d8e71a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "patient_summaries",
+        sa.Column("patient_id", sa.UUID(), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("mode", sa.String(length=20), nullable=False),
+        sa.Column(
+            "generated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["patient_id"], ["patients.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("patient_id"),
+    )
+    op.create_table(
+        "summary_jobs",
+        sa.Column("patient_id", sa.UUID(), nullable=False),
+        sa.Column("enqueued_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["patient_id"], ["patients.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("patient_id"),
+    )
+    op.create_index(
+        op.f("ix_summary_jobs_enqueued_at"),
+        "summary_jobs",
+        ["enqueued_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_summary_jobs_enqueued_at"), table_name="summary_jobs")
+    op.drop_table("summary_jobs")
+    op.drop_table("patient_summaries")
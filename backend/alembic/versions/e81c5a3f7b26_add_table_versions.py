@@ -0,0 +1,66 @@
+"""add table versions maintained by triggers
+
+Revision ID: e81c5a3f7b26
+Revises: d47a0e5b9c12
+Create Date: 2026-10-16 21:24:10.553817
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e81c5a3f7b26"
+down_revision: Union[str, Sequence[str], None] = "d47a0e5b9c12"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.Text(), nullable=False),
+        sa.Column("slot", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name", "slot"),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            picked integer;
+        BEGIN
+            SELECT slot INTO picked FROM table_versions
+            WHERE table_name = TG_TABLE_NAME
+            ORDER BY slot LIMIT 1
+            FOR UPDATE SKIP LOCKED;
+            IF NOT FOUND THEN
+                INSERT INTO table_versions (table_name, slot, version)
+                SELECT TG_TABLE_NAME, s, 0 FROM generate_series(0, 16 - 1) s
+                ON CONFLICT DO NOTHING;
+                picked := mod(pg_backend_pid(), 16);
+            END IF;
+            UPDATE table_versions SET version = version + 1
+            WHERE table_name = TG_TABLE_NAME AND slot = picked;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER patients_bump_version "
+        "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON patients "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER patients_bump_version ON patients")
+    op.execute("DROP FUNCTION bump_table_version()")
+    op.drop_table("table_versions")
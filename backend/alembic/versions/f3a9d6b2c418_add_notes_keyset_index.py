@@ -0,0 +1,37 @@
+"""replace notes patient_id index with a keyset pagination index
+
+Revision ID: f3a9d6b2c418
+Revises: e81c5a3f7b26
+Create Date: 2026-10-16 22:05:31.904127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9d6b2c418"
+down_revision: Union[str, Sequence[str], None] = "e81c5a3f7b26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_notes_patient_id_timestamp_id",
+        "notes",
+        ["patient_id", sa.text("timestamp DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_include=["created_at"],
+    )
+    op.drop_index("ix_notes_patient_id", table_name="notes")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_notes_patient_id", "notes", ["patient_id"], unique=False)
+    op.drop_index("ix_notes_patient_id_timestamp_id", table_name="notes")
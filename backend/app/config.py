@@ -3,10 +3,45 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    DB_COMMAND_TIMEOUT: float | None = None
     BACKEND_CORS_ORIGINS: str = ""
     SUMMARY_MODE: str = "template"
     OPENROUTER_API_KEY: str = ""
     OPENROUTER_MODEL: str = "google/gemini-2.0-flash-001"
+    STATS_CACHE_TTL_SECONDS: float = 5.0
+    SUMMARY_CACHE_SIZE: int = 1024
+    SUMMARY_CACHE_TTL_SECONDS: float = 300.0
+    SUMMARY_BATCH_CONCURRENCY: int = 8
+    SUMMARY_WORKER_ENABLED: bool = True
+    SUMMARY_WORKER_BATCH_SIZE: int = 20
+    SUMMARY_WORKER_LEASE_SECONDS: float = 120.0
+    SUMMARY_WORKER_POLL_SECONDS: float = 1.0
+    # Claims retried at the lease interval before a job whose LLM call keeps
+    # failing backs off, from SUMMARY_WORKER_BACKOFF_SECONDS doubling up to
+    # SUMMARY_WORKER_MAX_BACKOFF_SECONDS between further claims.
+    SUMMARY_WORKER_MAX_ATTEMPTS: int = 5
+    SUMMARY_WORKER_BACKOFF_SECONDS: float = 300.0
+    SUMMARY_WORKER_MAX_BACKOFF_SECONDS: float = 3600.0
+    LLM_LATENCY_BUDGET_SECONDS: float = 10.0
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_MIN_REQUESTS: int = 5
+    LLM_BREAKER_WINDOW_SECONDS: float = 60.0
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    # Fraction of requests to each path that get an access log line, as
+    # JSON (e.g. {"/api/health": 0.01}); errors are always logged.
+    ACCESS_LOG_SAMPLE_RATES: dict[str, float] = {"/api/health": 0.01}
+    # Requests issuing more queries than this are logged as warnings, to
+    # catch N+1 patterns. Unset disables the check.
+    QUERY_COUNT_BUDGET: int | None = None
+    # Shared directory where each worker process writes its metrics so
+    # /api/metrics can report all of them. Unset for a single process.
+    METRICS_MULTIPROC_DIR: str | None = None
+    METRICS_FLUSH_SECONDS: float = 5.0
 
     @property
     def cors_origins(self) -> list[str]:
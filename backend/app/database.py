@@ -1,11 +1,44 @@
-from collections.abc import AsyncGenerator
+import time
+from collections.abc import AsyncGenerator, Sequence
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
 
 from app.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that tracks callers waiting on a connection checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_wait_seconds = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.waiting -= 1
+            self.checkouts += 1
+            self.checkout_wait_seconds += time.perf_counter() - start
+
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"command_timeout": settings.DB_COMMAND_TIMEOUT},
+)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 
@@ -21,3 +54,37 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+async def copy_records(
+    db: AsyncSession, table: str, columns: Sequence[str], records: list[tuple]
+) -> int:
+    """Bulk-insert ``records`` into ``table`` with ``COPY``.
+
+    Runs on the session's connection inside its transaction, so the rows
+    commit or roll back with everything else. Bypasses the ORM entirely.
+    """
+    if not records:
+        return 0
+    conn = await db.connection()
+    driver_conn = (await conn.get_raw_connection()).driver_connection
+    if not driver_conn.is_in_transaction():
+        # The asyncpg adapter only emits BEGIN along with its first
+        # statement; a COPY sent straight to the driver would autocommit.
+        await conn.execute(select(1))
+    await driver_conn.copy_records_to_table(table, records=records, columns=columns)
+    return len(records)
+
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "waiting": pool.waiting,
+        "checkouts": pool.checkouts,
+        "checkout_wait_ms": round(pool.checkout_wait_seconds * 1000, 2),
+    }
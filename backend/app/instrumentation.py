@@ -0,0 +1,98 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import LLM_REQUEST_DURATION
+
+_QUERY_START_KEY = "query_start"
+
+
+class RequestTimings:
+    """Time spent in the database and the LLM while serving one request."""
+
+    __slots__ = ("request_id", "db_queries", "db_seconds", "llm_seconds")
+
+    def __init__(self, request_id: str) -> None:
+        self.request_id = request_id
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.llm_seconds = 0.0
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Render as a ``Server-Timing`` header value."""
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries} queries", '
+            f"llm;dur={self.llm_seconds * 1000:.2f}, "
+            f"total;dur={total_seconds * 1000:.2f}"
+        )
+
+
+# Set by RequestLoggingMiddleware for the duration of each request. Tasks
+# spawned while serving it (and SQLAlchemy's greenlets) inherit the same
+# object, so their time is charged to the request that started them.
+_current: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def request_timings(request_id: str) -> Iterator[RequestTimings]:
+    timings = RequestTimings(request_id)
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+@contextmanager
+def track_llm() -> Iterator[None]:
+    """Charge the wall time of the enclosed block to the current request's LLM time.
+
+    The call is also recorded in the LLM latency histogram, labelled by
+    whether the block raised (including being cancelled by a timeout).
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        elapsed = time.perf_counter() - start
+        LLM_REQUEST_DURATION.observe(elapsed, outcome)
+        timings = _current.get()
+        if timings is not None:
+            timings.llm_seconds += elapsed
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _finish_query(conn) -> None:
+    start = conn.info[_QUERY_START_KEY].pop()
+    timings = _current.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += time.perf_counter() - start
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish_query(conn)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_QUERY_START_KEY):
+        _finish_query(conn)
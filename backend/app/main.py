@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -6,29 +7,55 @@ logging.getLogger("uvicorn.access").disabled = True
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.config import settings
-from app.database import async_session
-from app.middleware import RequestLoggingMiddleware
+from app.database import async_session, pool_stats
+from app.metrics import CONTENT_TYPE, render_metrics, run_metrics_flusher
+from app.middleware import (
+    MetricsMiddleware,
+    RequestLoggingMiddleware,
+    start_access_log,
+    stop_access_log,
+)
+from app.routers.note_search import router as note_search_router
 from app.routers.notes import router as notes_router
 from app.routers.patients import router as patients_router
+from app.routers.summary import batch_router as batch_summary_router
 from app.routers.summary import router as summary_router
 from app.seed import seed_notes, seed_patients
+from app.services.summary_service import llm_breaker_stats, summary_cache_stats
+from app.services.summary_worker import run_summary_worker
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    access_log = start_access_log()
     async with async_session() as db:
         await seed_patients(db)
         await seed_notes(db)
         await db.commit()
+
+    stop = asyncio.Event()
+    tasks = []
+    if settings.SUMMARY_WORKER_ENABLED:
+        tasks.append(asyncio.create_task(run_summary_worker(stop)))
+    if settings.METRICS_MULTIPROC_DIR:
+        tasks.append(asyncio.create_task(run_metrics_flusher(stop)))
     yield
+    stop.set()
+    await asyncio.gather(*tasks)
+    stop_access_log(access_log)
 
 
 app = FastAPI(title="Dash MD API", lifespan=lifespan)
 
-app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(
+    RequestLoggingMiddleware,
+    sample_rates=settings.ACCESS_LOG_SAMPLE_RATES,
+    query_budget=settings.QUERY_COUNT_BUDGET,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -49,9 +76,31 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
 
 app.include_router(patients_router)
 app.include_router(notes_router)
+app.include_router(note_search_router)
 app.include_router(summary_router)
+app.include_router(batch_summary_router)
 
 
 @app.get("/api/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/api/health/pool", include_in_schema=False)
+async def pool_health():
+    return pool_stats()
+
+
+@app.get("/api/health/summary-cache", include_in_schema=False)
+async def summary_cache_health():
+    return summary_cache_stats()
+
+
+@app.get("/api/health/llm-breaker", include_in_schema=False)
+async def llm_breaker_health():
+    return llm_breaker_stats()
+
+
+@app.get("/api/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(await render_metrics(), media_type=CONTENT_TYPE)
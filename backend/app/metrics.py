@@ -0,0 +1,317 @@
+"""In-process Prometheus metrics.
+
+Counters, gauges and histograms are plain dicts keyed by label values.
+They are only updated from the event loop thread, so recording a sample is
+a dict lookup and an addition with no locking. Under several worker
+processes each worker periodically writes a snapshot of its metrics to
+``METRICS_MULTIPROC_DIR``, and a scrape of any worker merges its own live
+values with the other workers' latest snapshots.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+from bisect import bisect_left
+from collections.abc import Callable
+from pathlib import Path
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+
+_registry: list["_Metric"] = []
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values: dict[Labels, float] = {}
+        _registry.append(self)
+
+    def samples(self) -> dict[Labels, object]:
+        return dict(self.values)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) - amount
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: a count for each bucket (not cumulative), the +Inf
+        # bucket, then the sum and count of all observations.
+        self.values: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0.0] * (len(self.buckets) + 3)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def samples(self) -> dict[Labels, object]:
+        return {labels: list(counts) for labels, counts in self.values.items()}
+
+
+class CallbackMetric(_Metric):
+    """Counter or gauge whose samples are read from ``collect`` at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Labels,
+        collect: Callable[[], dict[Labels, float]],
+        type: str = "gauge",
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.collect = collect
+        self.type = type
+
+    def samples(self) -> dict[Labels, object]:
+        return self.collect()
+
+
+def snapshot() -> dict:
+    """This process's samples in a JSON-serializable form."""
+    return {
+        metric.name: [
+            [list(labels), value] for labels, value in metric.samples().items()
+        ]
+        for metric in _registry
+    }
+
+
+def _merge(snapshots: list[dict]) -> dict[str, dict[Labels, object]]:
+    merged: dict[str, dict[Labels, object]] = {m.name: {} for m in _registry}
+    for snap in snapshots:
+        for name, samples in snap.items():
+            if name not in merged:
+                continue
+            into = merged[name]
+            for labels, value in samples:
+                key = tuple(labels)
+                if key not in into:
+                    into[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    into[key] = [a + b for a, b in zip(into[key], value)]
+                else:
+                    into[key] += value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def render(merged: dict[str, dict[Labels, object]]) -> str:
+    """Format merged samples in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for labels, value in sorted(merged[metric.name].items()):
+            if isinstance(metric, Histogram):
+                cumulative = 0.0
+                for bound, count in zip(
+                    (*metric.buckets, math.inf), value[: len(metric.buckets) + 1]
+                ):
+                    cumulative += count
+                    le = _format_labels(
+                        metric.labelnames, labels, f'le="{_format_value(bound)}"'
+                    )
+                    lines.append(
+                        f"{metric.name}_bucket{le} {_format_value(cumulative)}"
+                    )
+                label_str = _format_labels(metric.labelnames, labels)
+                lines.append(f"{metric.name}_sum{label_str} {_format_value(value[-2])}")
+                lines.append(
+                    f"{metric.name}_count{label_str} {_format_value(value[-1])}"
+                )
+            else:
+                label_str = _format_labels(metric.labelnames, labels)
+                lines.append(f"{metric.name}{label_str} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_snapshots(directory: Path, own_pid: int) -> list[dict]:
+    gauges = {m.name for m in _registry if m.type == "gauge"}
+    snapshots = []
+    for path in directory.glob("*.json"):
+        try:
+            pid = int(path.stem)
+        except ValueError:
+            continue
+        if pid == own_pid:
+            continue
+        try:
+            snap = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if not _pid_alive(pid):
+            # Counters and histograms from an exited worker still count
+            # towards the totals; its gauges no longer describe anything.
+            snap = {
+                name: samples for name, samples in snap.items() if name not in gauges
+            }
+        snapshots.append(snap)
+    return snapshots
+
+
+def _write_snapshot(directory: Path, snap: dict) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snap))
+    os.replace(tmp, path)
+
+
+async def render_metrics() -> str:
+    """Render this worker's metrics merged with the other workers' snapshots."""
+    snapshots = [snapshot()]
+    if settings.METRICS_MULTIPROC_DIR:
+        snapshots += await asyncio.to_thread(
+            _read_snapshots, Path(settings.METRICS_MULTIPROC_DIR), os.getpid()
+        )
+    return render(_merge(snapshots))
+
+
+async def run_metrics_flusher(stop: asyncio.Event) -> None:
+    """Write this worker's snapshot for other workers' scrapes until ``stop`` is set."""
+    directory = Path(settings.METRICS_MULTIPROC_DIR)
+    while True:
+        try:
+            await asyncio.to_thread(_write_snapshot, directory, snapshot())
+        except OSError:
+            logger.exception("Failed to write metrics snapshot to %s", directory)
+        if stop.is_set():
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), settings.METRICS_FLUSH_SECONDS)
+        except TimeoutError:
+            pass
+
+
+def _pool_connections() -> dict[Labels, float]:
+    pool = engine.pool
+    return {
+        ("checked_out",): pool.checkedout(),
+        ("idle",): pool.checkedin(),
+        ("overflow",): max(pool.overflow(), 0),
+    }
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+SUMMARY_GENERATIONS = Counter(
+    "summary_generations_total",
+    "Patient summaries generated (cache misses) by mode: llm, template, "
+    "or fallback when an LLM summary was wanted but the template was served.",
+    ("mode",),
+)
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds",
+    "LLM provider call latency by outcome.",
+    ("outcome",),
+    buckets=(0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0),
+)
+DB_POOL_CONNECTIONS = CallbackMetric(
+    "db_pool_connections",
+    "Database pool connections by state.",
+    ("state",),
+    _pool_connections,
+)
+DB_POOL_WAITING = CallbackMetric(
+    "db_pool_waiting",
+    "Requests waiting for a database connection.",
+    (),
+    lambda: {(): engine.pool.waiting},
+)
+DB_POOL_CHECKOUTS = CallbackMetric(
+    "db_pool_checkouts_total",
+    "Database connections checked out of the pool.",
+    (),
+    lambda: {(): engine.pool.checkouts},
+    type="counter",
+)
+DB_POOL_CHECKOUT_WAIT = CallbackMetric(
+    "db_pool_checkout_wait_seconds_total",
+    "Time spent waiting for a database connection.",
+    (),
+    lambda: {(): engine.pool.checkout_wait_seconds},
+    type="counter",
+)
@@ -1,42 +1,188 @@
 import json
 import logging
+import queue
+import random
 import time
 import uuid
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.instrumentation import RequestTimings, request_timings
+from app.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS, HTTP_REQUESTS_IN_FLIGHT
 
 logger = logging.getLogger("dash_md.access")
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        raw_id = request.headers.get("x-request-id")
-        if raw_id:
+class _JsonMessage:
+    """Log message that is only serialized when a handler formats it."""
+
+    __slots__ = ("entry",)
+
+    def __init__(self, entry: dict) -> None:
+        self.entry = entry
+
+    def __str__(self) -> str:
+        return json.dumps(self.entry)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # QueueHandler.prepare() formats the record on the calling thread; skip
+    # it so JSON serialization happens on the listener thread instead.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def start_access_log() -> QueueListener:
+    """Route access log records through a queue drained by a background thread.
+
+    The listener writes to the root logger's handlers, so output looks the
+    same as before; only the formatting and I/O move off the event loop.
+    """
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(
+        records, *logging.getLogger().handlers, respect_handler_level=True
+    )
+    logger.addHandler(_DeferredQueueHandler(records))
+    logger.propagate = False
+    listener.start()
+    return listener
+
+
+def stop_access_log(listener: QueueListener) -> None:
+    """Flush queued records and restore direct logging."""
+    for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        logger.removeHandler(handler)
+    logger.propagate = True
+    listener.stop()
+
+
+def _request_id(scope: Scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
             try:
-                request_id = str(uuid.UUID(raw_id))
+                return str(uuid.UUID(value.decode("latin-1")))
             except ValueError:
-                request_id = str(uuid.uuid4())
-        else:
-            request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+                break
+    return str(uuid.uuid4())
+
+
+class RequestLoggingMiddleware:
+    """Pure ASGI access logging that tags every response with ``X-Request-ID``.
 
+    Each entry records the request's database query count and time and its
+    LLM time, which are also sent as a ``Server-Timing`` header.
+    ``sample_rates`` maps exact paths to the fraction of their requests that
+    get logged; responses with status >= 400 are always logged. Requests
+    issuing more than ``query_budget`` queries are logged as warnings.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rates: dict[str, float] | None = None,
+        query_budget: int | None = None,
+    ):
+        self.app = app
+        self.sample_rates = sample_rates or {}
+        self.query_budget = query_budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope)
+        # Backs request.state.request_id for handlers and the error handler.
+        scope.setdefault("state", {})["request_id"] = request_id
+        status_code = 500
         start = time.perf_counter()
-        response = await call_next(request)
-        duration_ms = round((time.perf_counter() - start) * 1000, 2)
 
-        response.headers["X-Request-ID"] = request_id
+        with request_timings(request_id) as timings:
+
+            async def send_with_headers(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Request-ID"] = request_id
+                    # Covers work done before the headers; a streamed body's
+                    # later queries only show up in the log entry.
+                    headers["Server-Timing"] = timings.server_timing(
+                        time.perf_counter() - start
+                    )
+                await send(message)
 
-        log_entry = {
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                self._log(scope, status_code, start, timings)
+
+    def _log(
+        self, scope: Scope, status_code: int, start: float, timings: RequestTimings
+    ) -> None:
+        over_budget = (
+            self.query_budget is not None and timings.db_queries > self.query_budget
+        )
+        path = scope["path"]
+        rate = self.sample_rates.get(path, 1.0)
+        if not (
+            over_budget or status_code >= 400 or rate >= 1.0 or random.random() < rate
+        ):
+            return
+        entry = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
-            "method": request.method,
-            "path": request.url.path,
-            "status_code": response.status_code,
-            "duration_ms": duration_ms,
-            "request_id": request_id,
+            "method": scope["method"],
+            "path": path,
+            "status_code": status_code,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "db_queries": timings.db_queries,
+            "db_ms": round(timings.db_seconds * 1000, 2),
+            "llm_ms": round(timings.llm_seconds * 1000, 2),
+            "request_id": timings.request_id,
         }
-        logger.info(json.dumps(log_entry))
+        if over_budget:
+            entry["query_budget_exceeded"] = True
+            logger.warning("%s", _JsonMessage(entry))
+        else:
+            logger.info("%s", _JsonMessage(entry))
+
 
-        return response
+class MetricsMiddleware:
+    """Record request counts, latency and concurrency for ``/api/metrics``.
+
+    Requests are labelled with the matched route's path template (e.g.
+    ``/api/patients/{patient_id}``) rather than the raw path, so IDs don't
+    create a new series per record. Requests that match no route share the
+    ``unmatched`` label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # The router records the matched route in the shared scope.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
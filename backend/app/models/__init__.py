@@ -1,4 +1,13 @@
 from app.models.note import Note
 from app.models.patient import Patient
+from app.models.summary import SummaryJob, SummaryRecord
+from app.models.table_version import NoteVersion, TableVersion
 
-__all__ = ["Note", "Patient"]
+__all__ = [
+    "Note",
+    "NoteVersion",
+    "Patient",
+    "SummaryJob",
+    "SummaryRecord",
+    "TableVersion",
+]
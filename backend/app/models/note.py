@@ -1,15 +1,19 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Text, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Computed, DateTime, ForeignKey, Index, Text, func
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.models.table_version import track_note_versions
 
 
 class Note(Base):
     __tablename__ = "notes"
+    __table_args__ = (
+        Index("ix_notes_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -18,12 +22,31 @@ class Note(Base):
         UUID(as_uuid=True),
         ForeignKey("patients.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    # Maintained by Postgres so full-text search never parses content at
+    # query time; see note_service.search_notes.
+    content_tsv: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('english', content)", persisted=True),
+        deferred=True,
+    )
 
     patient = relationship("Patient", back_populates="notes")
+
+
+# Serves note_service.get_notes' keyset pages and the per-patient recent
+# notes in get_summary_inputs, both ordered (timestamp DESC, id DESC); its
+# patient_id prefix also covers the foreign key.
+Index(
+    "ix_notes_patient_id_timestamp_id",
+    Note.patient_id,
+    Note.timestamp.desc(),
+    Note.id.desc(),
+)
+
+track_note_versions(Note.__table__)
@@ -1,15 +1,37 @@
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, String, func
+from sqlalchemy import Computed, Date, DateTime, Index, String, Text, func
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.models.table_version import track_table_version
 
 
 class Patient(Base):
     __tablename__ = "patients"
+    # Composite (sort column, id) indexes back keyset pagination in
+    # patient_service.get_patients; the status-prefixed ones serve the
+    # filtered list views.
+    __table_args__ = (
+        Index("ix_patients_first_name_id", "first_name", "id"),
+        Index("ix_patients_last_name_id", "last_name", "id"),
+        Index("ix_patients_date_of_birth_id", "date_of_birth", "id"),
+        Index("ix_patients_status_id", "status", "id"),
+        Index("ix_patients_last_visit_date_id", "last_visit_date", "id"),
+        Index("ix_patients_created_at_id", "created_at", "id"),
+        Index("ix_patients_status_last_name_id", "status", "last_name", "id"),
+        Index(
+            "ix_patients_status_last_visit_date_id", "status", "last_visit_date", "id"
+        ),
+        Index(
+            "ix_patients_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -28,9 +50,7 @@ class Patient(Base):
     conditions: Mapped[list[str]] = mapped_column(
         ARRAY(String), default=list, server_default="{}"
     )
-    status: Mapped[str] = mapped_column(
-        String(20), nullable=False, default="active", index=True
-    )
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="active")
     last_visit_date: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
@@ -43,5 +63,22 @@ class Patient(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
+    # Generated from the searchable fields so one trigram index can serve
+    # substring search across name and email.
+    search_text: Mapped[str] = mapped_column(
+        Text,
+        Computed("first_name || ' ' || last_name || ' ' || email", persisted=True),
+        deferred=True,
+    )
+
+    # Notes are removed by the ON DELETE CASCADE foreign key; passive_deletes
+    # stops the ORM loading them just to delete each one itself.
+    notes = relationship(
+        "Note",
+        back_populates="patient",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
 
-    notes = relationship("Note", back_populates="patient", cascade="all, delete-orphan")
+track_table_version(Patient.__table__)
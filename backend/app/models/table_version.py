@@ -0,0 +1,128 @@
+import uuid
+
+from sqlalchemy import DDL, BigInteger, ForeignKey, Integer, Table, Text, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+# Writers spread their bumps over at most this many rows per table.
+VERSION_SLOTS = 16
+
+# Bumps one of the calling table's version rows once per writing statement.
+# Runs in the writer's transaction, so readers only see the new version
+# once the rows it covers are committed. SKIP LOCKED picks a slot no other
+# open transaction holds, so writers don't queue behind one hot row: a long
+# bulk COPY keeps its slot locked until it commits but leaves the others
+# free. Only when every slot is taken (more than VERSION_SLOTS concurrent
+# writers) does a writer wait, on its backend's slot. The slots are
+# created by the first write after the table is created or cleared.
+BUMP_TABLE_VERSION_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    picked integer;
+BEGIN
+    SELECT slot INTO picked FROM table_versions
+    WHERE table_name = TG_TABLE_NAME
+    ORDER BY slot LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+    IF NOT FOUND THEN
+        INSERT INTO table_versions (table_name, slot, version)
+        SELECT TG_TABLE_NAME, s, 0 FROM generate_series(0, {VERSION_SLOTS} - 1) s
+        ON CONFLICT DO NOTHING;
+        picked := mod(pg_backend_pid(), {VERSION_SLOTS});
+    END IF;
+    UPDATE table_versions SET version = version + 1
+    WHERE table_name = TG_TABLE_NAME AND slot = picked;
+    RETURN NULL;
+END
+$$
+"""
+
+
+# Adds the number of notes a statement inserted or deleted to each affected
+# patient's note version. Reads the statement's transition table, so a
+# COPY of many notes costs one upsert per patient. Patients deleted by the
+# same statement (the cascade from a patient delete) are skipped.
+BUMP_NOTE_VERSIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_note_versions() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO note_versions (patient_id, version)
+    SELECT changed.patient_id, count(*)
+    FROM changed_notes AS changed
+    JOIN patients ON patients.id = changed.patient_id
+    GROUP BY changed.patient_id
+    ORDER BY changed.patient_id
+    ON CONFLICT (patient_id)
+    DO UPDATE SET version = note_versions.version + excluded.version;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def note_version_triggers_sql(table_name: str) -> list[str]:
+    return [
+        f"CREATE TRIGGER {table_name}_bump_note_versions_{event} "
+        f"AFTER {event.upper()} ON {table_name} "
+        f"REFERENCING {transition} TABLE AS changed_notes "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_note_versions()"
+        for event, transition in (("insert", "NEW"), ("delete", "OLD"))
+    ]
+
+
+def version_trigger_sql(table_name: str) -> str:
+    return (
+        f"CREATE TRIGGER {table_name}_bump_version "
+        f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table_name} "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()"
+    )
+
+
+class TableVersion(Base):
+    """Write counter per table, maintained by triggers.
+
+    A table's version is the sum over its slot rows, which grows with every
+    committed write. List endpoints derive ETags from it: one primary-key
+    range scan tells them whether anything in the table changed, in every
+    worker process.
+    """
+
+    __tablename__ = "table_versions"
+
+    table_name: Mapped[str] = mapped_column(Text, primary_key=True)
+    slot: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class NoteVersion(Base):
+    """Per-patient count of note inserts and deletes, maintained by triggers.
+
+    Notes are never edited in place, so this changes with every write to a
+    patient's notes; the notes list derives its ETag from it with one
+    primary-key lookup, however long the history.
+    """
+
+    __tablename__ = "note_versions"
+
+    patient_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("patients.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+def track_table_version(table: Table) -> None:
+    """Install the version trigger when ``table`` is created via metadata."""
+    event.listen(table, "after_create", DDL(BUMP_TABLE_VERSION_FUNCTION))
+    event.listen(table, "after_create", DDL(version_trigger_sql(table.name)))
+
+
+def track_note_versions(table: Table) -> None:
+    """Install the note version triggers when ``table`` is created via metadata."""
+    event.listen(table, "after_create", DDL(BUMP_NOTE_VERSIONS_FUNCTION))
+    for sql in note_version_triggers_sql(table.name):
+        event.listen(table, "after_create", DDL(sql))
@@ -0,0 +1,42 @@
+from collections.abc import Sequence
+from functools import cache
+from typing import Any
+from uuid import UUID
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def orjson_default(value: Any) -> str:
+    # asyncpg returns its own uuid.UUID subclass, which orjson only
+    # serializes natively as the exact type.
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson.
+
+    For read endpoints that build plain dicts from database rows instead of
+    validating a response model. UTC datetimes get a ``Z`` suffix, the same
+    as pydantic writes them, so both paths produce identical JSON.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default, option=orjson.OPT_UTC_Z)
+
+
+@cache
+def _field_names(model: type[BaseModel]) -> Sequence[str]:
+    return tuple(model.model_fields)
+
+
+def dump_attributes(obj: object, model: type[BaseModel]) -> dict[str, Any]:
+    """Read ``model``'s fields off ``obj`` as a dict, without validating them.
+
+    Only for objects already known to match the model, such as ORM rows
+    whose columns back a read schema.
+    """
+    return {name: getattr(obj, name) for name in _field_names(model)}
@@ -0,0 +1,76 @@
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.responses import ORJSONResponse, dump_attributes
+from app.schemas.note import NoteResponse, NoteSearchResult
+from app.schemas.patient import PATIENT_STATUSES
+from app.services import note_service
+from app.services.export import MEDIA_TYPES, ExportFormat, encode_rows
+
+router = APIRouter(prefix="/api/notes", tags=["notes"])
+
+
+@router.get("/search", response_model=list[NoteSearchResult])
+async def search_notes(
+    q: str = Query(min_length=1, max_length=200),
+    patient_id: UUID | None = Query(default=None),
+    patient_status: PATIENT_STATUSES | None = Query(default=None, alias="status"),
+    date_from: datetime | None = Query(default=None, alias="from"),
+    date_to: datetime | None = Query(default=None, alias="to"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    results = await note_service.search_notes(
+        db,
+        q,
+        patient_id=patient_id,
+        status=patient_status,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        offset=offset,
+    )
+    return ORJSONResponse(
+        [
+            {**dump_attributes(note, NoteResponse), "rank": rank, "snippet": snippet}
+            for note, rank, snippet in results
+        ]
+    )
+
+
+@router.get("/export")
+async def export_notes(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    patient_id: UUID | None = Query(default=None),
+    patient_status: PATIENT_STATUSES | None = Query(default=None, alias="status"),
+    date_from: datetime | None = Query(default=None, alias="from"),
+    date_to: datetime | None = Query(default=None, alias="to"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream every matching note as NDJSON or CSV."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    rows = note_service.stream_notes(
+        db,
+        patient_id=patient_id,
+        status=patient_status,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    return StreamingResponse(
+        encode_rows(rows, note_service.EXPORT_COLUMNS, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="notes.{export_format}"'
+        },
+    )
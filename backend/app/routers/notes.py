@@ -1,11 +1,23 @@
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status as http_status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status as http_status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.schemas.note import NoteCreate, NoteResponse
+from app.responses import ORJSONResponse, dump_attributes
+from app.schemas.note import NoteCreate, NotePage, NoteResponse
 from app.services import note_service
+from app.services.etag import etag_matches, make_etag, not_modified
 
 router = APIRouter(
     prefix="/api/patients/{patient_id}/notes",
@@ -25,15 +37,50 @@ async def create_note(
         raise HTTPException(status_code=404, detail="Patient not found")
 
 
-@router.get("", response_model=list[NoteResponse])
+@router.get("", response_model=NotePage)
 async def list_notes(
+    request: Request,
     patient_id: UUID,
+    limit: int = Query(default=20, ge=1, le=100),
+    after: str | None = Query(default=None, max_length=1000),
+    date_from: datetime | None = Query(default=None, alias="from"),
+    date_to: datetime | None = Query(default=None, alias="to"),
+    if_none_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
 ):
-    try:
-        return await note_service.get_notes(db, patient_id)
-    except ValueError:
+    """Page through a patient's notes, newest first.
+
+    Pass a page's ``next_cursor`` as ``after`` to fetch the next one.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    # Doubles as the existence check.
+    version = await note_service.get_notes_version(db, patient_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Patient not found")
+    etag = make_etag(patient_id, version, sorted(request.query_params.multi_items()))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        notes, next_cursor = await note_service.get_notes(
+            db,
+            patient_id,
+            limit=limit,
+            after=after,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(
+        {
+            "items": [dump_attributes(note, NoteResponse) for note in notes],
+            "next_cursor": next_cursor,
+        },
+        headers={"ETag": etag},
+    )
 
 
 @router.delete("/{note_id}", status_code=http_status.HTTP_204_NO_CONTENT)
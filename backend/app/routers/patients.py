@@ -1,74 +1,157 @@
+import json
+from collections.abc import AsyncIterator
+from typing import Any, Literal
 from uuid import UUID
 
 from fastapi import (
     APIRouter,
     Depends,
+    Header,
     HTTPException,
     Query,
+    Request,
     Response,
     status as http_status,
 )
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.responses import ORJSONResponse, dump_attributes
 from app.schemas.patient import (
     PATIENT_STATUSES,
+    BulkImportResult,
     PaginatedResponse,
     PatientCreate,
     PatientResponse,
+    PatientStats,
+    PatientUpdate,
 )
-from app.services.patient_service import SORTABLE_COLUMNS
 from app.services import patient_service
+from app.services.etag import etag_matches, make_etag, not_modified
+from app.services.export import MEDIA_TYPES, ExportFormat, encode_rows
+from app.services.patient_service import RELEVANCE_SORT, SORTABLE_COLUMNS
 
 router = APIRouter(prefix="/api/patients", tags=["patients"])
 
 
 @router.get("", response_model=PaginatedResponse)
 async def list_patients(
+    request: Request,
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
     search: str | None = Query(default=None, max_length=200),
     patient_status: PATIENT_STATUSES | None = Query(default=None, alias="status"),
     sort_by: str = Query(default="last_name"),
     sort_order: str = Query(default="asc"),
+    after: str | None = Query(default=None, max_length=1000),
+    before: str | None = Query(default=None, max_length=1000),
+    include_total: bool = Query(default=True),
+    total_mode: Literal["exact", "estimate", "window"] = Query(default="exact"),
+    if_none_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
 ):
-    if sort_by not in SORTABLE_COLUMNS:
+    if sort_by not in SORTABLE_COLUMNS and sort_by != RELEVANCE_SORT:
+        allowed = sorted(SORTABLE_COLUMNS | {RELEVANCE_SORT})
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid sort_by column. Allowed: {', '.join(sorted(SORTABLE_COLUMNS))}",
+            detail=f"Invalid sort_by column. Allowed: {', '.join(allowed)}",
         )
     if sort_order not in ("asc", "desc"):
         raise HTTPException(
             status_code=400,
             detail="Invalid sort_order. Allowed: asc, desc",
         )
+    if after and before:
+        raise HTTPException(
+            status_code=400,
+            detail="Only one of after, before may be given",
+        )
+
+    # Planner estimates drift without any write, so those pages get no ETag.
+    etag = None
+    if total_mode != "estimate":
+        version = await patient_service.get_patients_version(db)
+        etag = make_etag(
+            "patients", version, sorted(request.query_params.multi_items())
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
 
-    patients, total = await patient_service.get_patients(
-        db,
-        limit=limit,
-        offset=offset,
-        search=search,
-        status=patient_status,
-        sort_by=sort_by,
-        sort_order=sort_order,
+    try:
+        patients, total, next_cursor, prev_cursor = await patient_service.get_patients(
+            db,
+            limit=limit,
+            offset=offset,
+            search=search,
+            status=patient_status,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            after=after,
+            before=before,
+            include_total=include_total,
+            total_mode=total_mode,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Rows come straight from the database, so the page is serialized
+    # without validating it against PaginatedResponse.
+    return ORJSONResponse(
+        {
+            "items": [dump_attributes(p, PatientResponse) for p in patients],
+            "total": total,
+            "total_is_estimate": total is not None and total_mode == "estimate",
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        },
+        headers={"ETag": etag} if etag is not None else None,
     )
-    return PaginatedResponse(
-        items=patients,
-        total=total,
-        limit=limit,
-        offset=offset,
+
+
+@router.get("/export")
+async def export_patients(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    search: str | None = Query(default=None, max_length=200),
+    patient_status: PATIENT_STATUSES | None = Query(default=None, alias="status"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream every patient matching the list filters as NDJSON or CSV."""
+    rows = patient_service.stream_patients(db, search=search, status=patient_status)
+    return StreamingResponse(
+        encode_rows(rows, patient_service.EXPORT_COLUMNS, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="patients.{export_format}"'
+        },
     )
 
 
+@router.get("/stats", response_model=PatientStats)
+async def get_patient_stats(db: AsyncSession = Depends(get_db)):
+    return await patient_service.get_patient_stats(db)
+
+
 @router.get("/{patient_id}", response_model=PatientResponse)
 async def get_patient(
     patient_id: UUID,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
 ):
+    if if_none_match:
+        # Revalidation only needs updated_at, not the row.
+        updated_at = await patient_service.get_patient_updated_at(db, patient_id)
+        if updated_at is not None:
+            etag = make_etag(patient_id, updated_at.isoformat())
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
     patient = await patient_service.get_patient(db, patient_id)
     if patient is None:
         raise HTTPException(status_code=404, detail="Patient not found")
+    response.headers["ETag"] = make_etag(patient.id, patient.updated_at.isoformat())
     return patient
 
 
@@ -82,6 +165,60 @@ async def create_patient(
     return await patient_service.create_patient(db, data)
 
 
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/jsonl"}
+
+
+async def _ndjson_rows(request: Request) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def _json_array_rows(rows: list[Any]) -> AsyncIterator[Any]:
+    for row in rows:
+        yield row
+
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_create_patients(
+    request: Request,
+    mode: Literal["all_or_nothing", "skip_invalid"] = Query(default="all_or_nothing"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Import many patients from NDJSON or a JSON array in one transaction.
+
+    In ``all_or_nothing`` mode any invalid row fails the whole import with a
+    422 listing every invalid row; ``skip_invalid`` loads the valid rows and
+    reports the rest. Row indices are zero-based and ignore blank NDJSON
+    lines.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type in NDJSON_MEDIA_TYPES:
+        rows = _ndjson_rows(request)
+    else:
+        try:
+            body = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be valid JSON")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array")
+        rows = _json_array_rows(body)
+
+    inserted, errors = await patient_service.bulk_create_patients(
+        db, rows, skip_invalid=mode == "skip_invalid"
+    )
+    if errors and mode == "all_or_nothing":
+        # Raising rolls back any chunks already copied in this transaction.
+        raise HTTPException(status_code=422, detail=errors)
+    return BulkImportResult(inserted=inserted, errors=errors)
+
+
 @router.put("/{patient_id}", response_model=PatientResponse)
 async def update_patient(
     patient_id: UUID,
@@ -94,6 +231,18 @@ async def update_patient(
     return patient
 
 
+@router.patch("/{patient_id}", response_model=PatientResponse)
+async def patch_patient(
+    patient_id: UUID,
+    data: PatientUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    patient = await patient_service.patch_patient(db, patient_id, data)
+    if patient is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return patient
+
+
 @router.delete("/{patient_id}", status_code=http_status.HTTP_204_NO_CONTENT)
 async def delete_patient(
     patient_id: UUID,
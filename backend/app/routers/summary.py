@@ -1,22 +1,159 @@
+import json
+from datetime import datetime
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
-from app.schemas.summary import PatientSummary
-from app.services import note_service, patient_service
-from app.services.summary_service import generate_summary
+from app.schemas.summary import BatchSummaryItem, BatchSummaryRequest, PatientSummary
+from app.services import note_service, patient_service, summary_store
+from app.services.summary_service import (
+    generate_summaries,
+    generate_summary,
+    is_fallback,
+    stream_summary,
+)
 
 router = APIRouter(prefix="/api/patients/{patient_id}", tags=["summary"])
+batch_router = APIRouter(prefix="/api/patients", tags=["summary"])
+
+
+async def _claim_or_wait(
+    db: AsyncSession, patient_id: UUID
+) -> tuple[PatientSummary | None, datetime | None]:
+    """On a store miss, take the generation lease or wait for its holder.
+
+    Returns ``(stored, lease)``: the summary another process stored while
+    this one waited, or the lease to complete after saving. Both are
+    ``None`` if the wait timed out, in which case the caller generates
+    without a lease.
+    """
+    lease_seconds = settings.LLM_LATENCY_BUDGET_SECONDS
+    lease = await summary_store.claim_summary_generation(db, patient_id, lease_seconds)
+    if lease is not None:
+        return None, lease
+    if await patient_service.get_patient_updated_at(db, patient_id) is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    await db.commit()
+    return await summary_store.wait_for_summary_generation(
+        db, patient_id, lease_seconds, timeout=lease_seconds
+    )
+
+
+async def _save_generated(
+    db: AsyncSession,
+    patient_id: UUID,
+    summary: PatientSummary,
+    lease: datetime | None,
+) -> None:
+    """Store a generated summary and release its lease in one transaction."""
+    if not is_fallback(summary):
+        await summary_store.save_summary(db, patient_id, summary)
+    if lease is not None:
+        # Also releases the lease after a fallback: nothing was stored, so
+        # the next read retries the LLM.
+        await summary_store.complete_summary_jobs(db, [(patient_id, lease)])
+    await db.commit()
 
 
 @router.get("/summary", response_model=PatientSummary)
 async def get_patient_summary(patient_id: UUID, db: AsyncSession = Depends(get_db)):
-    patient = await patient_service.get_patient(db, patient_id)
-    if patient is None:
+    """Serve the stored summary; generate synchronously only on a miss.
+
+    A stored summary whose regeneration is still queued is returned as-is
+    with ``stale`` set; the background worker refreshes it. On a miss only
+    the caller holding the generation lease calls the LLM; concurrent
+    misses in other processes wait for its stored result.
+    """
+    stored = await summary_store.get_stored_summary(db, patient_id)
+    if stored is not None:
+        return stored
+    stored, lease = await _claim_or_wait(db, patient_id)
+    if stored is not None:
+        return stored
+
+    # Loaded after the lease is taken, so a write landing in between
+    # re-enqueues the job and completing the lease won't drop it.
+    inputs = await note_service.get_summary_inputs(db, [patient_id])
+    if patient_id not in inputs:
         raise HTTPException(status_code=404, detail="Patient not found")
+    # Return the connection to the pool for the LLM call; the save below
+    # checks one out again for a single short transaction.
+    await db.commit()
+
+    summary = await generate_summary(*inputs[patient_id])
+    await _save_generated(db, patient_id, summary, lease)
+    return summary
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/summary/stream")
+async def stream_patient_summary(patient_id: UUID, db: AsyncSession = Depends(get_db)):
+    """Stream the summary as Server-Sent Events (``delta``/``fallback``/``done``).
+
+    Reads through the summary store like ``GET /summary``: a stored
+    summary, or one another process finishes while this one waits, is sent
+    as a single ``done`` event. Otherwise the lease holder streams the LLM
+    output and stores the result.
+    """
+    stored = await summary_store.get_stored_summary(db, patient_id)
+    lease = None
+    if stored is None:
+        stored, lease = await _claim_or_wait(db, patient_id)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if stored is not None:
+        done = _sse("done", stored.model_dump(mode="json"))
+        return StreamingResponse(
+            iter([done]), media_type="text/event-stream", headers=headers
+        )
+
+    inputs = await note_service.get_summary_inputs(db, [patient_id])
+    if patient_id not in inputs:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    # Don't hold a pooled connection open while the LLM generates; the
+    # save after the stream checks one out again.
+    await db.commit()
+
+    async def events():
+        async for event, data in stream_summary(*inputs[patient_id]):
+            if event == "done":
+                summary = PatientSummary.model_validate(data)
+                await _save_generated(db, patient_id, summary, lease)
+            yield _sse(event, data)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+@batch_router.post("/summaries")
+async def get_patient_summaries(
+    data: BatchSummaryRequest, db: AsyncSession = Depends(get_db)
+):
+    """Stream one NDJSON ``BatchSummaryItem`` per requested patient.
+
+    Lines arrive in completion order, not request order.
+    """
+    patient_ids = list(dict.fromkeys(data.patient_ids))
+    inputs = await note_service.get_summary_inputs(db, patient_ids)
+    # Release the connection before generating up to a full batch of
+    # summaries; the stream only needs the loaded inputs.
+    await db.commit()
 
-    notes = await note_service.get_notes(db, patient_id)
+    async def stream():
+        for patient_id in patient_ids:
+            if patient_id not in inputs:
+                item = BatchSummaryItem(
+                    patient_id=patient_id, error="Patient not found"
+                )
+                yield item.model_dump_json() + "\n"
+        found = [inputs[pid] for pid in patient_ids if pid in inputs]
+        async for patient_id, summary in generate_summaries(found):
+            item = BatchSummaryItem(patient_id=patient_id, summary=summary)
+            yield item.model_dump_json() + "\n"
 
-    return await generate_summary(patient, notes)
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
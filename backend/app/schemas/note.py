@@ -17,3 +17,13 @@ class NoteResponse(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class NotePage(BaseModel):
+    items: list[NoteResponse]
+    next_cursor: str | None = None
+
+
+class NoteSearchResult(NoteResponse):
+    rank: float
+    snippet: str
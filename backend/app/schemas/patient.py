@@ -8,6 +8,21 @@ BLOOD_TYPES = Literal["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
 PATIENT_STATUSES = Literal["active", "inactive", "critical"]
 
 
+def _check_list_items(v: list[str]) -> list[str]:
+    if not isinstance(v, list):
+        return v
+    for item in v:
+        if isinstance(item, str) and len(item) > 200:
+            raise ValueError("Each item must be 200 characters or fewer")
+    return v
+
+
+def _check_dob_in_past(v: date) -> date:
+    if v >= date.today():
+        raise ValueError("Date of birth must be in the past")
+    return v
+
+
 class PatientBase(BaseModel):
     first_name: str = Field(min_length=1, max_length=100)
     last_name: str = Field(min_length=1, max_length=100)
@@ -22,30 +37,89 @@ class PatientBase(BaseModel):
     status: PATIENT_STATUSES = "active"
     last_visit_date: datetime | None = None
 
-    @field_validator("allergies", "conditions", mode="before")
-    @classmethod
-    def validate_list_items(cls, v: list[str]) -> list[str]:
-        if not isinstance(v, list):
-            return v
-        for item in v:
-            if isinstance(item, str) and len(item) > 200:
-                raise ValueError("Each item must be 200 characters or fewer")
-        return v
-
-    @field_validator("date_of_birth")
-    @classmethod
-    def validate_dob_in_past(cls, v: date) -> date:
-        if v >= date.today():
-            raise ValueError("Date of birth must be in the past")
-        return v
+    validate_list_items = field_validator("allergies", "conditions", mode="before")(
+        _check_list_items
+    )
+    validate_dob_in_past = field_validator("date_of_birth")(_check_dob_in_past)
 
 
 class PatientCreate(PatientBase):
     pass
 
 
-class PatientResponse(PatientBase):
+# Columns a partial update may clear with an explicit null. Every other
+# PatientUpdate field may be omitted but not set to null.
+PATIENT_NULLABLE_FIELDS = frozenset({"blood_type", "last_visit_date"})
+
+
+def _reject_null(v: object) -> object:
+    if v is None:
+        raise ValueError("Field may be omitted but cannot be null")
+    return v
+
+
+class PatientUpdate(BaseModel):
+    """Partial update: only fields present in the request are written.
+
+    Every field defaults to ``None`` to mark it as omitted. An explicit
+    ``null`` clears the fields in ``PATIENT_NULLABLE_FIELDS`` and fails
+    validation for the rest.
+    """
+
+    first_name: str | None = Field(default=None, min_length=1, max_length=100)
+    last_name: str | None = Field(default=None, min_length=1, max_length=100)
+    date_of_birth: date | None = None
+    gender: str | None = Field(default=None, min_length=1, max_length=20)
+    email: EmailStr | None = None
+    phone: str | None = Field(default=None, min_length=1, max_length=20)
+    address: str | None = Field(default=None, min_length=1, max_length=500)
+    blood_type: BLOOD_TYPES | None = None
+    allergies: list[str] | None = Field(default=None, max_length=50)
+    conditions: list[str] | None = Field(default=None, max_length=50)
+    status: PATIENT_STATUSES | None = None
+    last_visit_date: datetime | None = None
+
+    # Defined before the other validators so null is rejected before they
+    # see it.
+    reject_null = field_validator(
+        "first_name",
+        "last_name",
+        "date_of_birth",
+        "gender",
+        "email",
+        "phone",
+        "address",
+        "allergies",
+        "conditions",
+        "status",
+    )(_reject_null)
+    validate_list_items = field_validator("allergies", "conditions", mode="before")(
+        _check_list_items
+    )
+    validate_dob_in_past = field_validator("date_of_birth")(_check_dob_in_past)
+
+
+class PatientResponse(BaseModel):
+    """A stored patient.
+
+    Deliberately not a ``PatientBase``: rows read back from the database
+    were validated on the way in, and re-running ``EmailStr`` and the field
+    validators on every row made serialization several times slower.
+    """
+
     id: uuid.UUID
+    first_name: str
+    last_name: str
+    date_of_birth: date
+    gender: str
+    email: str
+    phone: str
+    address: str
+    blood_type: BLOOD_TYPES | None
+    allergies: list[str]
+    conditions: list[str]
+    status: PATIENT_STATUSES
+    last_visit_date: datetime | None
     created_at: datetime
     updated_at: datetime
 
@@ -54,6 +128,26 @@ class PatientResponse(PatientBase):
 
 class PaginatedResponse(BaseModel):
     items: list[PatientResponse]
-    total: int
+    total: int | None
+    total_is_estimate: bool = False
     limit: int
     offset: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class PatientStats(BaseModel):
+    total: int
+    active: int
+    inactive: int
+    critical: int
+
+
+class BulkImportRowError(BaseModel):
+    index: int
+    errors: list[dict]
+
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    errors: list[BulkImportRowError]
@@ -1,8 +1,23 @@
+import uuid
+from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PatientSummary(BaseModel):
     summary: str
     mode: Literal["llm", "template"]
+    cached: bool = False
+    stale: bool = False
+    generated_at: datetime | None = None
+
+
+class BatchSummaryRequest(BaseModel):
+    patient_ids: list[uuid.UUID] = Field(min_length=1, max_length=500)
+
+
+class BatchSummaryItem(BaseModel):
+    patient_id: uuid.UUID
+    summary: PatientSummary | None = None
+    error: str | None = None
@@ -1,11 +1,19 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
 import uuid
-from datetime import date, datetime, timezone
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import async_session, copy_records
 from app.models.note import Note
 from app.models.patient import Patient
+from app.services.patient_service import COPY_COLUMNS as PATIENT_COPY_COLUMNS
 
 SEED_PATIENTS = [
     {
@@ -601,3 +609,308 @@ async def seed_notes(db: AsyncSession) -> None:
 
     for data in SEED_NOTES:
         db.add(Note(**data))
+
+
+# Synthetic data for load testing: ``python -m app.seed --patients N``.
+# Every field is sampled from the hand-written seed data above, widened
+# with extra names so name/email searches have realistic selectivity.
+
+EXTRA_FIRST_NAMES = {
+    "Female": [
+        "Olivia",
+        "Emma",
+        "Ava",
+        "Sophia",
+        "Isabella",
+        "Mia",
+        "Amelia",
+        "Harper",
+        "Evelyn",
+        "Abigail",
+        "Emily",
+        "Ella",
+        "Grace",
+        "Chloe",
+        "Victoria",
+        "Nora",
+        "Hannah",
+        "Lucy",
+        "Zoe",
+        "Leah",
+        "Aaliyah",
+        "Mei",
+        "Fatima",
+        "Priya",
+        "Ana",
+        "Ingrid",
+        "Yuki",
+        "Amara",
+    ],
+    "Male": [
+        "Liam",
+        "Noah",
+        "Oliver",
+        "Elijah",
+        "Lucas",
+        "Mason",
+        "Logan",
+        "Ethan",
+        "Jacob",
+        "Michael",
+        "Daniel",
+        "Henry",
+        "Jackson",
+        "Samuel",
+        "Sebastian",
+        "Owen",
+        "Wyatt",
+        "Isaac",
+        "Caleb",
+        "Nathan",
+        "Omar",
+        "Hiroshi",
+        "Mateo",
+        "Arjun",
+        "Kwame",
+        "Lars",
+        "Dmitri",
+        "Tariq",
+    ],
+}
+
+EXTRA_LAST_NAMES = [
+    "Smith",
+    "Johnson",
+    "Williams",
+    "Brown",
+    "Jones",
+    "Garcia",
+    "Miller",
+    "Davis",
+    "Rodriguez",
+    "Martinez",
+    "Hernandez",
+    "Lopez",
+    "Gonzalez",
+    "Wilson",
+    "Anderson",
+    "Thomas",
+    "Taylor",
+    "Moore",
+    "Jackson",
+    "Martin",
+    "Lee",
+    "Perez",
+    "Thompson",
+    "White",
+    "Harris",
+    "Sanchez",
+    "Clark",
+    "Ramirez",
+    "Lewis",
+    "Robinson",
+    "Walker",
+    "Young",
+    "Allen",
+    "King",
+    "Wright",
+    "Scott",
+    "Torres",
+    "Nguyen",
+    "Hill",
+    "Flores",
+    "Green",
+    "Adams",
+    "Nelson",
+    "Baker",
+    "Hall",
+    "Rivera",
+    "Campbell",
+    "Mitchell",
+    "Carter",
+    "Roberts",
+    "Kowalski",
+    "Haddad",
+    "Mensah",
+    "Lindqvist",
+    "Ivanova",
+    "Tanaka",
+    "Chatterjee",
+    "Oyelaran",
+    "Dubois",
+    "Rossi",
+]
+
+NOTE_COPY_COLUMNS = ("id", "patient_id", "content", "timestamp")
+
+# Generated visits end at the newest seeded visit, so output doesn't depend
+# on the day the generator runs.
+_REFERENCE_TIME = max(
+    p["last_visit_date"] for p in SEED_PATIENTS if p["last_visit_date"]
+)
+
+
+class SyntheticData:
+    """Deterministic patient/note generator; the same seed yields the same rows."""
+
+    def __init__(self, seed: int, notes_per_patient: int) -> None:
+        self.rng = random.Random(seed)
+        self.notes_per_patient = notes_per_patient
+        self.first_names = {
+            gender: sorted(
+                {p["first_name"] for p in SEED_PATIENTS if p["gender"] == gender}
+                | set(names)
+            )
+            for gender, names in EXTRA_FIRST_NAMES.items()
+        }
+        self.last_names = sorted(
+            {p["last_name"] for p in SEED_PATIENTS} | set(EXTRA_LAST_NAMES)
+        )
+        self.conditions = sorted({c for p in SEED_PATIENTS for c in p["conditions"]})
+        self.allergies = sorted({a for p in SEED_PATIENTS for a in p["allergies"]})
+        addresses = [p["address"].split(", ", 1) for p in SEED_PATIENTS]
+        self.streets = sorted({street.split(" ", 1)[1] for street, _ in addresses})
+        self.localities = sorted({locality for _, locality in addresses})
+        self.note_contents = [n["content"] for n in SEED_NOTES]
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def patient(self, index: int) -> tuple:
+        rng = self.rng
+        # Categorical fields follow the seed data's own distributions.
+        template = rng.choice(SEED_PATIENTS)
+        gender = template["gender"]
+        first_name = rng.choice(self.first_names[gender])
+        last_name = rng.choice(self.last_names)
+        age_days = rng.randint(365, 95 * 365)
+        last_visit = (
+            _REFERENCE_TIME - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60))
+            if rng.choice(SEED_PATIENTS)["last_visit_date"]
+            else None
+        )
+        values = {
+            "id": self._uuid(),
+            "first_name": first_name,
+            "last_name": last_name,
+            "date_of_birth": _REFERENCE_TIME.date() - timedelta(days=age_days),
+            "gender": gender,
+            "email": f"{first_name}.{last_name}.{index}@example.com".lower(),
+            "phone": f"555-{rng.randint(0, 9999):04d}",
+            "address": (
+                f"{rng.randint(1, 999)} {rng.choice(self.streets)}, "
+                f"{rng.choice(self.localities)}"
+            ),
+            "blood_type": rng.choice(SEED_PATIENTS)["blood_type"],
+            "allergies": rng.sample(
+                self.allergies, len(rng.choice(SEED_PATIENTS)["allergies"])
+            ),
+            "conditions": rng.sample(
+                self.conditions, len(rng.choice(SEED_PATIENTS)["conditions"])
+            ),
+            "status": template["status"],
+            "last_visit_date": last_visit,
+        }
+        return tuple(values[c] for c in PATIENT_COPY_COLUMNS)
+
+    def notes(self, patient_id: uuid.UUID, last_visit: datetime | None) -> list[tuple]:
+        """Notes spread over the three years up to the patient's last visit."""
+        rng = self.rng
+        # Averages notes_per_patient while keeping some patients note-free.
+        count = rng.randint(0, 2 * self.notes_per_patient)
+        latest = last_visit or _REFERENCE_TIME
+        return [
+            (
+                self._uuid(),
+                patient_id,
+                rng.choice(self.note_contents),
+                latest - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+            )
+            for _ in range(count)
+        ]
+
+    def batches(
+        self, patients: int, batch_size: int
+    ) -> Iterator[tuple[list[tuple], list[tuple]]]:
+        id_at = PATIENT_COPY_COLUMNS.index("id")
+        visit_at = PATIENT_COPY_COLUMNS.index("last_visit_date")
+        for start in range(0, patients, batch_size):
+            patient_rows = [
+                self.patient(i) for i in range(start, min(start + batch_size, patients))
+            ]
+            note_rows = [
+                note
+                for row in patient_rows
+                for note in self.notes(row[id_at], row[visit_at])
+            ]
+            yield patient_rows, note_rows
+
+
+async def generate(
+    patients: int,
+    notes_per_patient: int,
+    seed: int,
+    batch_size: int = 10_000,
+    truncate: bool = False,
+) -> None:
+    data = SyntheticData(seed, notes_per_patient)
+    started = time.perf_counter()
+    loaded_patients = loaded_notes = 0
+    async with async_session() as db:
+        if truncate:
+            await db.execute(text("TRUNCATE patients CASCADE"))
+            await db.commit()
+        # One transaction per batch: progress survives an interrupted load
+        # and no single transaction grows with the dataset.
+        for patient_rows, note_rows in data.batches(patients, batch_size):
+            loaded_patients += await copy_records(
+                db, Patient.__tablename__, PATIENT_COPY_COLUMNS, patient_rows
+            )
+            loaded_notes += await copy_records(
+                db, Note.__tablename__, NOTE_COPY_COLUMNS, note_rows
+            )
+            await db.commit()
+            elapsed = time.perf_counter() - started
+            print(
+                f"{loaded_patients} patients, {loaded_notes} notes "
+                f"({(loaded_patients + loaded_notes) / elapsed:,.0f} rows/s)",
+                file=sys.stderr,
+            )
+        await db.execute(text("ANALYZE patients"))
+        await db.execute(text("ANALYZE notes"))
+        await db.commit()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.seed",
+        description="Bulk-load deterministic synthetic patients and notes.",
+    )
+    parser.add_argument("--patients", type=int, required=True)
+    parser.add_argument(
+        "--notes-per-patient",
+        type=int,
+        default=10,
+        help="average notes per patient (default: 10)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="delete all existing patients, notes and summaries first",
+    )
+    args = parser.parse_args(argv)
+    asyncio.run(
+        generate(
+            args.patients,
+            args.notes_per_patient,
+            args.seed,
+            batch_size=args.batch_size,
+            truncate=args.truncate,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
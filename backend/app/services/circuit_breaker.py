@@ -0,0 +1,131 @@
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Literal
+
+logger = logging.getLogger(__name__)
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for calls to an external dependency.
+
+    Outcomes are tracked over a rolling time window. Once at least
+    ``min_requests`` calls have been seen and the failure rate reaches
+    ``failure_rate``, the breaker opens and ``allow()`` refuses calls for
+    ``cooldown_seconds`` (or longer, if the dependency sent ``Retry-After``).
+    After that a single probe is let through in the half-open state: success
+    closes the breaker, failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float,
+        min_requests: int,
+        window_seconds: float,
+        cooldown_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._state: BreakerState = "closed"
+        self._open_until = 0.0
+        self._probe_started: float | None = None
+        self.transitions: dict[str, int] = {}
+        self.rejected = 0
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state == "open" and self._clock() >= self._open_until:
+            self._transition("half_open")
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open":
+            now = self._clock()
+            # A probe that never reported back (e.g. its request was
+            # cancelled) must not wedge the breaker half-open forever.
+            if (
+                self._probe_started is None
+                or now - self._probe_started >= self.cooldown_seconds
+            ):
+                self._probe_started = now
+                return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state == "half_open":
+            self._outcomes.clear()
+            self._transition("closed")
+            return
+        self._record(True)
+
+    def record_failure(self, retry_after: float | None = None) -> None:
+        if self._state == "half_open":
+            self._open(retry_after)
+            return
+        self._record(False)
+        if self._state == "open":
+            # A call that started before the breaker opened; only a longer
+            # Retry-After can push the reopen time out.
+            if retry_after is not None:
+                self._open_until = max(self._open_until, self._clock() + retry_after)
+            return
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        tripped = (
+            len(self._outcomes) >= self.min_requests
+            and failures / len(self._outcomes) >= self.failure_rate
+        )
+        if tripped or retry_after is not None:
+            self._open(retry_after)
+
+    def reset(self) -> None:
+        self._outcomes.clear()
+        self._state = "closed"
+        self._open_until = 0.0
+        self._probe_started = None
+        self.transitions.clear()
+        self.rejected = 0
+
+    def stats(self) -> dict:
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "window_requests": len(self._outcomes),
+            "window_failures": failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
+
+    def _record(self, ok: bool) -> None:
+        now = self._clock()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self, retry_after: float | None) -> None:
+        delay = max(self.cooldown_seconds, retry_after or 0.0)
+        self._open_until = self._clock() + delay
+        self._transition("open")
+
+    def _transition(self, state: BreakerState) -> None:
+        if state == self._state:
+            return
+        key = f"{self._state}->{state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        logger.info("Circuit breaker %s: %s", self.name, key)
+        self._state = state
+        self._probe_started = None
@@ -0,0 +1,28 @@
+from collections.abc import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_HOOKS_KEY = "after_commit_hooks"
+
+
+def after_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the session's current transaction commits.
+
+    Services use this to invalidate in-process caches only after their
+    writes are visible, so a concurrent reader can't re-cache stale rows
+    between the write and the commit. Callbacks are dropped on rollback.
+    """
+    db.sync_session.info.setdefault(_HOOKS_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop(_HOOKS_KEY, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_HOOKS_KEY, None)
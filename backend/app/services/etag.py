@@ -0,0 +1,30 @@
+import hashlib
+
+from starlette import status
+from starlette.responses import Response
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag over the ``str()`` of each part."""
+    digest = hashlib.sha256("\x1f".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header value matches ``etag``.
+
+    Uses the weak comparison RFC 9110 specifies for ``If-None-Match``, so a
+    ``W/`` prefix added by an intermediary doesn't defeat the match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
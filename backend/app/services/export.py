@@ -0,0 +1,63 @@
+import csv
+import io
+from collections.abc import AsyncIterator, Mapping, Sequence
+from datetime import date, datetime
+from typing import Any, Literal
+
+import orjson
+
+from app.responses import orjson_default
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Rows fetched per server-side cursor round trip, and encoded per chunk of
+# the response body.
+EXPORT_BATCH_SIZE = 1000
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+async def encode_rows(
+    batches: AsyncIterator[Sequence[Mapping[str, Any]]],
+    columns: Sequence[str],
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Encode batches of row mappings as NDJSON lines or CSV with a header.
+
+    Yields one chunk per batch so the response is written in large chunks
+    rather than a line at a time.
+    """
+    if export_format == "ndjson":
+        async for rows in batches:
+            yield b"".join(
+                orjson.dumps(
+                    {c: row[c] for c in columns},
+                    default=orjson_default,
+                    option=orjson.OPT_APPEND_NEWLINE,
+                )
+                for row in rows
+            )
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(row[c]) for c in columns] for row in rows)
+        yield buffer.getvalue().encode()
@@ -1,47 +1,281 @@
+import html
+import uuid
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import RowMapping, delete, func, insert, literal, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.models.note import Note
 from app.models.patient import Patient
+from app.models.table_version import NoteVersion
 from app.schemas.note import NoteCreate
+from app.services.commit_hooks import after_commit
+from app.services.export import EXPORT_BATCH_SIZE
+from app.services.pagination import (
+    decode_cursor,
+    encode_cursor,
+    keyset_predicate,
+    parse_cursor_id,
+    parse_cursor_value,
+)
+from app.services.summary_service import SUMMARY_NOTE_LIMIT, invalidate_summary
+from app.services.summary_store import enqueue_summary_jobs_for
 
 
-async def _get_patient_or_raise(db: AsyncSession, patient_id: UUID) -> Patient:
-    result = await db.execute(select(Patient).where(Patient.id == patient_id))
-    patient = result.scalars().first()
-    if patient is None:
+async def create_note(db: AsyncSession, patient_id: UUID, data: NoteCreate) -> Note:
+    """Insert a note and queue its patient's summary in a single statement.
+
+    The note is inserted by selecting from ``patients``, so a missing
+    patient inserts nothing rather than failing the foreign key; the
+    summary job upsert runs as a CTE over the inserted row.
+    """
+    inserted = (
+        insert(Note)
+        .from_select(
+            ["id", "patient_id", "content", "timestamp"],
+            select(
+                literal(uuid.uuid4(), Note.id.type),
+                Patient.id,
+                literal(data.content, Note.content.type),
+                literal(data.timestamp, Note.timestamp.type),
+            ).where(Patient.id == patient_id),
+        )
+        .returning(*Note.__table__.columns)
+        .cte("inserted")
+    )
+    result = await db.execute(
+        select(aliased(Note, inserted)).add_cte(
+            enqueue_summary_jobs_for(inserted.c.patient_id).cte("enqueued")
+        )
+    )
+    note = result.scalars().first()
+    if note is None:
         raise ValueError("Patient not found")
-    return patient
+    after_commit(db, lambda: invalidate_summary(patient_id))
+    return note
 
 
-async def create_note(db: AsyncSession, patient_id: UUID, data: NoteCreate) -> Note:
-    await _get_patient_or_raise(db, patient_id)
-    note = Note(patient_id=patient_id, **data.model_dump())
-    db.add(note)
-    await db.flush()
-    await db.refresh(note)
-    return note
+def _encode_note_cursor(note: Note) -> str:
+    return encode_cursor({"t": note.timestamp, "id": note.id})
+
+
+def _decode_note_cursor(token: str) -> tuple[datetime, UUID]:
+    payload = decode_cursor(token)
+    id_value = parse_cursor_id(payload)
+    return parse_cursor_value(Note.timestamp, payload.get("t")), id_value
 
 
-async def get_notes(db: AsyncSession, patient_id: UUID) -> list[Note]:
-    await _get_patient_or_raise(db, patient_id)
+async def get_notes(
+    db: AsyncSession,
+    patient_id: UUID,
+    limit: int = 20,
+    after: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> tuple[list[Note], str | None]:
+    """Return a page of a patient's notes, newest first, and the next cursor.
+
+    Pages seek on ``(timestamp, id)`` along
+    ``ix_notes_patient_id_timestamp_id``, so a page costs the same however
+    long the patient's history is. Doesn't check that the patient exists;
+    a missing one just has no notes.
+    """
+    limit = min(limit, 100)
+    query = select(Note).where(Note.patient_id == patient_id)
+    if date_from:
+        query = query.where(Note.timestamp >= date_from)
+    if date_to:
+        query = query.where(Note.timestamp <= date_to)
+    if after:
+        timestamp, id_value = _decode_note_cursor(after)
+        query = query.where(
+            keyset_predicate(Note.timestamp, Note.id, timestamp, id_value, True)
+        )
+    query = query.order_by(Note.timestamp.desc(), Note.id.desc()).limit(limit + 1)
+
+    notes = list((await db.execute(query)).scalars().all())
+    next_cursor = None
+    if len(notes) > limit:
+        notes = notes[:limit]
+        next_cursor = _encode_note_cursor(notes[-1])
+    return notes, next_cursor
+
+
+async def get_notes_version(db: AsyncSession, patient_id: UUID) -> int | None:
+    """Counter bumped by every committed note write for a patient.
+
+    A primary-key lookup, so it costs the same however many notes the
+    patient has. Returns ``None`` if the patient doesn't exist.
+    """
+    result = await db.execute(
+        select(func.coalesce(NoteVersion.version, 0))
+        .select_from(Patient)
+        .outerjoin(NoteVersion, NoteVersion.patient_id == Patient.id)
+        .where(Patient.id == patient_id)
+    )
+    row = result.first()
+    return None if row is None else row[0]
+
+
+async def get_summary_inputs(
+    db: AsyncSession, patient_ids: list[UUID], limit: int = SUMMARY_NOTE_LIMIT
+) -> dict[UUID, tuple[Patient, list[Note], int]]:
+    """Load what a summary needs for each patient in a single statement.
+
+    Returns ``(patient, recent_notes, note_count)`` keyed by patient id, with
+    at most ``limit`` notes per patient, newest first. A lateral subquery
+    picks the recent notes per patient; the window count is evaluated before
+    its ``LIMIT``, so it still sees every note. Missing patients are absent
+    from the result.
+    """
+    recent = (
+        select(
+            Note.id,
+            Note.patient_id,
+            Note.content,
+            Note.timestamp,
+            Note.created_at,
+            func.count().over().label("note_count"),
+        )
+        .where(Note.patient_id == Patient.id)
+        .order_by(Note.timestamp.desc(), Note.id.desc())
+        .limit(limit)
+        .lateral("recent_notes")
+    )
+    recent_note = aliased(Note, recent)
     result = await db.execute(
-        select(Note)
-        .where(Note.patient_id == patient_id)
-        .order_by(Note.timestamp.desc())
+        select(Patient, recent_note, recent.c.note_count)
+        .outerjoin(recent, true())
+        .where(Patient.id.in_(patient_ids))
+        .order_by(Patient.id, recent.c.timestamp.desc(), recent.c.id.desc())
     )
-    return list(result.scalars().all())
+    inputs: dict[UUID, tuple[Patient, list[Note], int]] = {}
+    for patient, note, note_count in result.all():
+        if patient.id not in inputs:
+            inputs[patient.id] = (patient, [], note_count or 0)
+        if note is not None:
+            inputs[patient.id][1].append(note)
+    return inputs
 
 
 async def delete_note(db: AsyncSession, note_id: UUID, patient_id: UUID) -> bool:
+    """Delete a note and queue its patient's summary in a single statement."""
+    deleted = (
+        delete(Note)
+        .where(Note.id == note_id, Note.patient_id == patient_id)
+        .returning(Note.patient_id)
+        .cte("deleted")
+    )
     result = await db.execute(
-        select(Note).where(Note.id == note_id, Note.patient_id == patient_id)
+        select(deleted.c.patient_id).add_cte(
+            enqueue_summary_jobs_for(deleted.c.patient_id).cte("enqueued")
+        )
     )
-    note = result.scalars().first()
-    if note is None:
+    if result.first() is None:
         return False
-    await db.delete(note)
-    await db.flush()
+    after_commit(db, lambda: invalidate_summary(patient_id))
     return True
+
+
+# ts_headline copies note content verbatim, so matches are delimited with
+# control characters and the snippet is HTML-escaped before they become
+# <mark> tags; see _highlight.
+HEADLINE_START = "\x02"
+HEADLINE_STOP = "\x03"
+HEADLINE_OPTIONS = (
+    f"StartSel={HEADLINE_START}, StopSel={HEADLINE_STOP}, MaxFragments=2, MaxWords=35"
+)
+
+
+def _highlight(headline: str) -> str:
+    """Turn a ts_headline fragment into safe HTML with matches in <mark>."""
+    return (
+        html.escape(headline, quote=True)
+        .replace(HEADLINE_START, "<mark>")
+        .replace(HEADLINE_STOP, "</mark>")
+    )
+
+
+async def search_notes(
+    db: AsyncSession,
+    q: str,
+    patient_id: UUID | None = None,
+    status: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[tuple[Note, float, str]]:
+    """Full-text search across all notes, best matches first.
+
+    Snippets are HTML-escaped, with matches wrapped in ``<mark>``.
+
+    Matching and ranking run against the GIN-indexed ``content_tsv`` column;
+    ``ts_headline`` re-parses content, so it is only applied to the rows of
+    the requested page.
+    """
+    limit = min(limit, 100)
+    tsquery = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank(Note.content_tsv, tsquery)
+
+    ranked = select(Note.id, rank.label("rank")).where(
+        Note.content_tsv.op("@@")(tsquery)
+    )
+    if patient_id:
+        ranked = ranked.where(Note.patient_id == patient_id)
+    if status:
+        ranked = ranked.join(Patient, Patient.id == Note.patient_id).where(
+            Patient.status == status
+        )
+    if date_from:
+        ranked = ranked.where(Note.timestamp >= date_from)
+    if date_to:
+        ranked = ranked.where(Note.timestamp <= date_to)
+    ranked = (
+        ranked.order_by(rank.desc(), Note.id).limit(limit).offset(offset).subquery()
+    )
+
+    # Strip the delimiters from the content so only real matches get marked.
+    content = func.translate(Note.content, HEADLINE_START + HEADLINE_STOP, "")
+    headline = func.ts_headline("english", content, tsquery, HEADLINE_OPTIONS)
+    result = await db.execute(
+        select(Note, ranked.c.rank, headline)
+        .join(ranked, Note.id == ranked.c.id)
+        .order_by(ranked.c.rank.desc(), Note.id)
+    )
+    return [(note, rank, _highlight(snippet)) for note, rank, snippet in result.all()]
+
+
+# Columns written by stream_notes, in export order.
+EXPORT_COLUMNS = ("id", "patient_id", "timestamp", "content", "created_at")
+
+
+async def stream_notes(
+    db: AsyncSession,
+    patient_id: UUID | None = None,
+    status: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> AsyncIterator[Sequence[RowMapping]]:
+    """Yield every matching note, in batches, from a server-side cursor."""
+    query = select(*(getattr(Note, c) for c in EXPORT_COLUMNS))
+    if patient_id:
+        query = query.where(Note.patient_id == patient_id)
+    if status:
+        query = query.join(Patient, Patient.id == Note.patient_id).where(
+            Patient.status == status
+        )
+    if date_from:
+        query = query.where(Note.timestamp >= date_from)
+    if date_to:
+        query = query.where(Note.timestamp <= date_to)
+    result = await db.stream(
+        query.order_by(
+            Note.patient_id, Note.timestamp.desc(), Note.id.desc()
+        ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    async for rows in result.mappings().partitions():
+        yield rows
@@ -0,0 +1,96 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, and_, or_, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def encode_cursor(payload: dict[str, Any]) -> str:
+    """Encode a cursor payload as an opaque URL-safe token."""
+    raw = json.dumps(payload, separators=(",", ":"), default=_json_default)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict[str, Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in cursor")
+
+
+def parse_cursor_id(payload: dict[str, Any]) -> UUID:
+    """The row id tie-breaker from a decoded cursor payload."""
+    raw = payload.get("id")
+    # UUID() raises AttributeError rather than ValueError for non-strings.
+    if not isinstance(raw, str):
+        raise ValueError("Invalid cursor")
+    try:
+        return UUID(raw)
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_cursor_value(column: InstrumentedAttribute, raw: Any) -> Any:
+    """Convert a JSON cursor value back to the column's Python type."""
+    if raw is None:
+        if not column.expression.nullable:
+            raise ValueError("Invalid cursor")
+        return None
+    if not isinstance(raw, str):
+        raise ValueError("Invalid cursor")
+    python_type = column.type.python_type
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(raw)
+        if python_type is date:
+            return date.fromisoformat(raw)
+        if python_type is UUID:
+            return UUID(raw)
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+    return raw
+
+
+def keyset_predicate(
+    column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    value: Any,
+    id_value: UUID,
+    descending: bool,
+) -> ColumnElement[bool]:
+    """Rows strictly after ``(value, id_value)`` in ``ORDER BY column, id``.
+
+    Matches Postgres' default NULL placement (last for ASC, first for DESC)
+    so the predicate agrees with a plain ``ORDER BY`` over the same index.
+    """
+    if not column.expression.nullable:
+        if descending:
+            return tuple_(column, id_column) < tuple_(value, id_value)
+        return tuple_(column, id_column) > tuple_(value, id_value)
+
+    if value is None:
+        tie = id_column < id_value if descending else id_column > id_value
+        null_rows = and_(column.is_(None), tie)
+        return or_(null_rows, column.is_not(None)) if descending else null_rows
+
+    after = (
+        tuple_(column, id_column) < tuple_(value, id_value)
+        if descending
+        else tuple_(column, id_column) > tuple_(value, id_value)
+    )
+    return after if descending else or_(after, column.is_(None))
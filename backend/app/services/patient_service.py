@@ -1,10 +1,42 @@
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Sequence
+from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import func, select
+from pydantic import ValidationError
+from sqlalchemy import (
+    ColumnElement,
+    RowMapping,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.config import settings
+from app.database import copy_records
 from app.models.patient import Patient
-from app.schemas.patient import PatientCreate
+from app.models.table_version import TableVersion
+from app.schemas.patient import PatientCreate, PatientStats, PatientUpdate
+from app.services.commit_hooks import after_commit
+from app.services.export import EXPORT_BATCH_SIZE
+from app.services.pagination import (
+    decode_cursor,
+    encode_cursor,
+    keyset_predicate,
+    parse_cursor_id,
+    parse_cursor_value,
+)
+from app.services.summary_service import invalidate_summary
+from app.services.summary_store import enqueue_summary_jobs_for
 
 SORTABLE_COLUMNS = {
     "first_name",
@@ -15,6 +47,126 @@ SORTABLE_COLUMNS = {
     "created_at",
 }
 
+# Ranks matches by trigram word similarity; only valid together with a search.
+RELEVANCE_SORT = "relevance"
+
+TOTAL_MODES = {"exact", "estimate", "window"}
+
+# Rows validated and COPYed per round trip by bulk_create_patients.
+BULK_CHUNK_SIZE = 1000
+
+# Columns written by copy_patients; created_at/updated_at take their server
+# defaults and search_text is generated.
+COPY_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "date_of_birth",
+    "gender",
+    "email",
+    "phone",
+    "address",
+    "blood_type",
+    "allergies",
+    "conditions",
+    "status",
+    "last_visit_date",
+)
+
+# Columns written by stream_patients, in export order.
+EXPORT_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "date_of_birth",
+    "gender",
+    "email",
+    "phone",
+    "address",
+    "blood_type",
+    "allergies",
+    "conditions",
+    "status",
+    "last_visit_date",
+    "created_at",
+    "updated_at",
+)
+
+# Bumped after every committed patient write; cached stats are only served
+# while their version matches. The TTL bounds staleness from writes made by
+# other worker processes, which this counter can't see.
+_patients_version = 0
+_stats_cache: tuple[int, float, PatientStats] | None = None
+
+
+def _bump_patients_version() -> None:
+    global _patients_version
+    _patients_version += 1
+
+
+def _list_filters(search: str | None, status: str | None) -> list[ColumnElement]:
+    filters = []
+    if search:
+        safe = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        # A single ILIKE over the generated search_text column lets the
+        # planner use its pg_trgm GIN index instead of scanning the table.
+        filters.append(Patient.search_text.ilike(f"%{safe}%"))
+    if status:
+        filters.append(Patient.status == status)
+    return filters
+
+
+def _encode_patient_cursor(patient: Patient, sort_by: str, sort_order: str) -> str:
+    return encode_cursor(
+        {
+            "s": sort_by,
+            "o": sort_order,
+            "v": getattr(patient, sort_by),
+            "id": patient.id,
+        }
+    )
+
+
+def _decode_patient_cursor(
+    token: str, sort_by: str, sort_order: str
+) -> tuple[object, UUID]:
+    payload = decode_cursor(token)
+    if payload.get("s") != sort_by or payload.get("o") != sort_order:
+        raise ValueError("Cursor does not match the requested sort")
+    id_value = parse_cursor_id(payload)
+    return parse_cursor_value(getattr(Patient, sort_by), payload.get("v")), id_value
+
+
+async def _estimate_count(db: AsyncSession, filters: list[ColumnElement]) -> int:
+    """Planner row estimate for the filtered listing; never scans the table."""
+    if not filters:
+        result = await db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": Patient.__tablename__},
+        )
+        reltuples = result.scalar_one()
+        # -1 means the table has never been vacuumed or analyzed.
+        if reltuples >= 0:
+            return int(reltuples)
+
+    conn = await db.connection()
+    compiled = select(Patient.id).where(*filters).compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _count_patients(
+    db: AsyncSession, filters: list[ColumnElement], total_mode: str
+) -> int:
+    if total_mode == "estimate":
+        return await _estimate_count(db, filters)
+    result = await db.execute(select(func.count()).select_from(Patient).where(*filters))
+    return result.scalar_one()
+
 
 async def get_patients(
     db: AsyncSession,
@@ -24,43 +176,158 @@ async def get_patients(
     status: str | None = None,
     sort_by: str = "last_name",
     sort_order: str = "asc",
-) -> tuple[list[Patient], int]:
+    after: str | None = None,
+    before: str | None = None,
+    include_total: bool = True,
+    total_mode: str = "exact",
+) -> tuple[list[Patient], int | None, str | None, str | None]:
+    """Return a page of patients, the filtered total and next/prev cursors.
+
+    Pages by ``offset`` unless an ``after``/``before`` cursor is given, in
+    which case the page is located by seeking on ``(sort_by, id)`` so deep
+    pages cost the same as the first one.
+
+    ``total_mode`` picks how the total is produced: ``exact`` runs a separate
+    ``count(*)``, ``estimate`` reads the planner's row estimate and
+    ``window`` folds ``count(*) OVER ()`` into the page query itself. The
+    total is ``None`` when ``include_total`` is false.
+    """
     limit = min(limit, 100)
+    if after and before:
+        raise ValueError("Only one of after/before may be given")
+    if total_mode not in TOTAL_MODES:
+        raise ValueError(f"Invalid total mode: {total_mode}")
 
-    query = select(Patient)
-    count_query = select(func.count()).select_from(Patient)
+    filters = _list_filters(search, status)
+    cursor = after or before
+    # The window count would only see rows past the cursor, so cursor pages
+    # fall back to a separate exact count.
+    windowed = include_total and total_mode == "window" and not cursor
 
-    if search:
-        safe = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
-        pattern = f"%{safe}%"
-        search_filter = (
-            Patient.first_name.ilike(pattern)
-            | Patient.last_name.ilike(pattern)
-            | Patient.email.ilike(pattern)
-        )
-        query = query.where(search_filter)
-        count_query = count_query.where(search_filter)
+    query = select(Patient).where(*filters)
+    if windowed:
+        query = query.add_columns(func.count().over())
 
-    if status:
-        query = query.where(Patient.status == status)
-        count_query = count_query.where(Patient.status == status)
+    if sort_by == RELEVANCE_SORT:
+        if not search:
+            raise ValueError("Relevance sort requires a search term")
+        if cursor:
+            raise ValueError("Cursor pagination is not supported for relevance sort")
+        query = query.order_by(
+            func.word_similarity(search, Patient.search_text).desc(), Patient.id
+        )
+        rows = (await db.execute(query.limit(limit).offset(offset))).all()
+        patients = [row[0] for row in rows]
+        total = await _page_total(db, rows, filters, include_total, total_mode)
+        return patients, total, None, None
 
     if sort_by not in SORTABLE_COLUMNS:
         raise ValueError(f"Invalid sort column: {sort_by}")
     column = getattr(Patient, sort_by)
-    if sort_order == "desc":
-        column = column.desc()
-    query = query.order_by(column)
+    descending = sort_order == "desc"
+
+    # Walking backwards from a "before" cursor scans the index in reverse
+    # and flips the page back into display order afterwards.
+    backwards = before is not None
+    scan_descending = descending != backwards
+    if cursor:
+        value, id_value = _decode_patient_cursor(cursor, sort_by, sort_order)
+        query = query.where(
+            keyset_predicate(column, Patient.id, value, id_value, scan_descending)
+        )
 
-    query = query.limit(limit).offset(offset)
+    if scan_descending:
+        query = query.order_by(column.desc(), Patient.id.desc())
+    else:
+        query = query.order_by(column, Patient.id)
 
-    result = await db.execute(query)
-    patients = list(result.scalars().all())
+    query = query.limit(limit + 1)
+    if not cursor:
+        query = query.offset(offset)
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    patients = [row[0] for row in rows]
+    if backwards:
+        patients.reverse()
 
-    return patients, total
+    total = await _page_total(db, rows, filters, include_total, total_mode)
+
+    next_cursor = prev_cursor = None
+    if patients:
+        has_next = (cursor is not None) if backwards else has_more
+        has_prev = has_more if backwards else (cursor is not None or offset > 0)
+        if has_next:
+            next_cursor = _encode_patient_cursor(patients[-1], sort_by, sort_order)
+        if has_prev:
+            prev_cursor = _encode_patient_cursor(patients[0], sort_by, sort_order)
+
+    return patients, total, next_cursor, prev_cursor
+
+
+async def _page_total(
+    db: AsyncSession,
+    rows: list,
+    filters: list[ColumnElement],
+    include_total: bool,
+    total_mode: str,
+) -> int | None:
+    if not include_total:
+        return None
+    # Windowed rows carry the total as their trailing column; an empty page
+    # (e.g. offset past the end) has nowhere to carry it, so count instead.
+    if rows and len(rows[0]) > 1:
+        return rows[0][-1]
+    return await _count_patients(
+        db, filters, "exact" if total_mode == "window" else total_mode
+    )
+
+
+async def stream_patients(
+    db: AsyncSession, search: str | None = None, status: str | None = None
+) -> AsyncIterator[Sequence[RowMapping]]:
+    """Yield every matching patient, in batches, from a server-side cursor.
+
+    Selects plain columns rather than ``Patient`` entities so a large export
+    never builds ORM objects or fills the identity map; memory is bounded by
+    ``EXPORT_BATCH_SIZE``.
+    """
+    result = await db.stream(
+        select(*(getattr(Patient, c) for c in EXPORT_COLUMNS))
+        .where(*_list_filters(search, status))
+        .order_by(Patient.last_name, Patient.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    async for rows in result.mappings().partitions():
+        yield rows
+
+
+async def get_patient_stats(db: AsyncSession) -> PatientStats:
+    """Patient counts per status from a single GROUP BY, cached in-process."""
+    global _stats_cache
+    version = _patients_version
+    now = time.monotonic()
+    if _stats_cache is not None:
+        cached_version, cached_at, stats = _stats_cache
+        if (
+            cached_version == version
+            and now - cached_at < settings.STATS_CACHE_TTL_SECONDS
+        ):
+            return stats
+
+    result = await db.execute(
+        select(Patient.status, func.count()).group_by(Patient.status)
+    )
+    counts = {status: count for status, count in result.all()}
+    stats = PatientStats(
+        total=sum(counts.values()),
+        active=counts.get("active", 0),
+        inactive=counts.get("inactive", 0),
+        critical=counts.get("critical", 0),
+    )
+    _stats_cache = (version, now, stats)
+    return stats
 
 
 async def get_patient(db: AsyncSession, patient_id: UUID) -> Patient | None:
@@ -68,34 +335,177 @@ async def get_patient(db: AsyncSession, patient_id: UUID) -> Patient | None:
     return result.scalars().first()
 
 
+async def get_patient_updated_at(db: AsyncSession, patient_id: UUID) -> datetime | None:
+    """A patient's ``updated_at`` without loading the row, for ETag checks."""
+    return await db.scalar(select(Patient.updated_at).where(Patient.id == patient_id))
+
+
+async def get_patients_version(db: AsyncSession) -> int:
+    """Counter bumped by every committed write to the patients table.
+
+    Read it before the data it describes: a write committing in between
+    then only costs a spurious mismatch, never a stale match.
+    """
+    version = await db.scalar(
+        select(func.sum(TableVersion.version)).where(
+            TableVersion.table_name == Patient.__tablename__
+        )
+    )
+    return int(version or 0)
+
+
 async def create_patient(db: AsyncSession, data: PatientCreate) -> Patient:
-    patient = Patient(**data.model_dump())
-    db.add(patient)
-    await db.flush()
-    await db.refresh(patient)
+    """Insert a patient and load the stored row with one ``INSERT ... RETURNING``."""
+    result = await db.execute(
+        insert(Patient).values(**data.model_dump()).returning(Patient)
+    )
+    patient = result.scalars().one()
+    after_commit(db, _bump_patients_version)
     return patient
 
 
-async def update_patient(
-    db: AsyncSession, patient_id: UUID, data: PatientCreate
+async def _update_patient(
+    db: AsyncSession, patient_id: UUID, values: dict[str, Any]
 ) -> Patient | None:
-    patient = await get_patient(db, patient_id)
+    # The UPDATE ... RETURNING runs as a CTE alongside the summary job
+    # upsert, so the row comes back and the job is queued in one round trip.
+    updated = (
+        update(Patient)
+        .where(Patient.id == patient_id)
+        .values(**values)
+        .returning(*Patient.__table__.columns)
+        .cte("updated")
+    )
+    result = await db.execute(
+        select(aliased(Patient, updated))
+        .add_cte(enqueue_summary_jobs_for(updated.c.id).cte("enqueued"))
+        .execution_options(populate_existing=True)
+    )
+    patient = result.scalars().first()
     if patient is None:
         return None
 
-    for field, value in data.model_dump().items():
-        setattr(patient, field, value)
-
-    await db.flush()
-    await db.refresh(patient)
+    after_commit(db, _bump_patients_version)
+    after_commit(db, lambda: invalidate_summary(patient_id))
     return patient
 
 
+async def update_patient(
+    db: AsyncSession, patient_id: UUID, data: PatientCreate
+) -> Patient | None:
+    """Replace every field of a patient in a single statement."""
+    return await _update_patient(db, patient_id, data.model_dump())
+
+
+async def patch_patient(
+    db: AsyncSession, patient_id: UUID, data: PatientUpdate
+) -> Patient | None:
+    """Write only the fields present in ``data``, in a single statement.
+
+    An empty update just reads the patient.
+    """
+    values = data.model_dump(exclude_unset=True)
+    if not values:
+        return await get_patient(db, patient_id)
+    return await _update_patient(db, patient_id, values)
+
+
 async def delete_patient(db: AsyncSession, patient_id: UUID) -> bool:
-    patient = await get_patient(db, patient_id)
-    if patient is None:
+    """Delete a patient with one ``DELETE ... RETURNING``.
+
+    Notes, the stored summary and any queued summary job go with it through
+    their ``ON DELETE CASCADE`` foreign keys; nothing is loaded first.
+    """
+    deleted = await db.scalar(
+        delete(Patient).where(Patient.id == patient_id).returning(Patient.id)
+    )
+    if deleted is None:
         return False
 
-    await db.delete(patient)
-    await db.flush()
+    after_commit(db, _bump_patients_version)
+    after_commit(db, lambda: invalidate_summary(patient_id))
     return True
+
+
+async def copy_patients(db: AsyncSession, patients: Iterable[PatientCreate]) -> int:
+    """Insert validated patients with ``COPY`` in the session's transaction."""
+    records = [
+        (uuid.uuid4(), *(getattr(p, column) for column in COPY_COLUMNS[1:]))
+        for p in patients
+    ]
+    inserted = await copy_records(db, Patient.__tablename__, COPY_COLUMNS, records)
+    if inserted:
+        after_commit(db, _bump_patients_version)
+    return inserted
+
+
+def _validate_import_chunk(
+    rows: list[Any], start: int
+) -> tuple[list[PatientCreate], list[dict]]:
+    valid: list[PatientCreate] = []
+    errors: list[dict] = []
+    for index, row in enumerate(rows, start):
+        try:
+            if isinstance(row, (bytes, str)):
+                valid.append(PatientCreate.model_validate_json(row))
+            else:
+                valid.append(PatientCreate.model_validate(row))
+        except ValidationError as e:
+            errors.append(
+                {
+                    "index": index,
+                    "errors": e.errors(
+                        include_url=False, include_context=False, include_input=False
+                    ),
+                }
+            )
+    return valid, errors
+
+
+async def bulk_create_patients(
+    db: AsyncSession, rows: AsyncIterable[Any], skip_invalid: bool = False
+) -> tuple[int, list[dict]]:
+    """Validate and load patients in chunks of ``BULK_CHUNK_SIZE``.
+
+    Rows are raw JSON documents or already-decoded objects. Returns the
+    number of rows inserted and one ``{"index", "errors"}`` report per
+    invalid row. Unless ``skip_invalid`` is set, loading stops at the first
+    invalid row (validation carries on so every error is reported) and the
+    caller is expected to roll back.
+
+    Validation is CPU-bound (mostly email checks), so each chunk is
+    validated in a worker thread while the previous chunk's ``COPY`` is in
+    flight, keeping the event loop free for other requests.
+    """
+    inserted = 0
+    errors: list[dict] = []
+    copying: asyncio.Task[int] | None = None
+
+    async def load(chunk: list[Any], start: int) -> None:
+        nonlocal inserted, copying
+        valid, chunk_errors = await asyncio.to_thread(
+            _validate_import_chunk, chunk, start
+        )
+        errors.extend(chunk_errors)
+        if copying is not None:
+            inserted += await copying
+            copying = None
+        if valid and (skip_invalid or not errors):
+            copying = asyncio.create_task(copy_patients(db, valid))
+
+    chunk: list[Any] = []
+    start = 0
+    try:
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                await load(chunk, start)
+                start += len(chunk)
+                chunk = []
+        await load(chunk, start)
+        if copying is not None:
+            inserted += await copying
+    finally:
+        if copying is not None and not copying.done():
+            copying.cancel()
+    return inserted, errors
@@ -1,18 +1,192 @@
+import asyncio
+import hashlib
+import json
 import logging
-from datetime import date, datetime
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, AsyncIterator
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from uuid import UUID
 
 import openai
 from openai import AsyncOpenAI
 
 from app.config import settings
+from app.instrumentation import track_llm
+from app.metrics import SUMMARY_GENERATIONS, CallbackMetric
 from app.models.note import Note
 from app.models.patient import Patient
 from app.schemas.summary import PatientSummary
+from app.services.circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
 _client: AsyncOpenAI | None = None
 
+# Most recent notes a summary looks at; older ones only contribute a count.
+SUMMARY_NOTE_LIMIT = 5
+
+# Errors that count against the LLM breaker and trigger a template fallback.
+LLM_ERRORS = (openai.APIError, openai.APITimeoutError, ValueError, TimeoutError)
+
+_llm_breaker = CircuitBreaker(
+    "openrouter",
+    failure_rate=settings.LLM_BREAKER_FAILURE_RATE,
+    min_requests=settings.LLM_BREAKER_MIN_REQUESTS,
+    window_seconds=settings.LLM_BREAKER_WINDOW_SECONDS,
+    cooldown_seconds=settings.LLM_BREAKER_COOLDOWN_SECONDS,
+)
+
+
+class _SummaryCache:
+    """Bounded LRU of generated summaries with a per-entry TTL.
+
+    Holds at most one entry per patient, tagged with the patient's
+    ``updated_at`` and a fingerprint of its notes; a lookup whose tag no
+    longer matches is a miss even before explicit invalidation lands.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[UUID, tuple[tuple, float, PatientSummary]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, patient_id: UUID, tag: tuple) -> PatientSummary | None:
+        entry = self._entries.get(patient_id)
+        if entry is not None:
+            entry_tag, expires_at, summary = entry
+            if entry_tag == tag and time.monotonic() < expires_at:
+                self._entries.move_to_end(patient_id)
+                self.hits += 1
+                return summary
+            del self._entries[patient_id]
+        self.misses += 1
+        return None
+
+    def put(self, patient_id: UUID, tag: tuple, summary: PatientSummary) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        self._entries[patient_id] = (tag, expires_at, summary)
+        self._entries.move_to_end(patient_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, patient_id: UUID) -> None:
+        self._entries.pop(patient_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+_summary_cache = _SummaryCache(
+    settings.SUMMARY_CACHE_SIZE, settings.SUMMARY_CACHE_TTL_SECONDS
+)
+
+
+# In-flight generations keyed by _payload_key, so concurrent requests for an
+# identical chart await one LLM call instead of each issuing their own.
+_inflight: dict[str, asyncio.Task[PatientSummary]] = {}
+
+
+# Registered here rather than in app.metrics, which this module imports.
+LLM_BREAKER_STATE = CallbackMetric(
+    "llm_breaker_state",
+    "Worker processes whose LLM circuit breaker is in each state.",
+    ("state",),
+    lambda: {
+        (state,): float(_llm_breaker.state == state)
+        for state in ("closed", "open", "half_open")
+    },
+)
+LLM_BREAKER_TRANSITIONS = CallbackMetric(
+    "llm_breaker_transitions_total",
+    "LLM circuit breaker state transitions.",
+    ("transition",),
+    lambda: {(key,): count for key, count in _llm_breaker.transitions.items()},
+    type="counter",
+)
+LLM_BREAKER_REJECTED = CallbackMetric(
+    "llm_breaker_rejected_total",
+    "LLM calls skipped because the circuit breaker was open.",
+    (),
+    lambda: {(): _llm_breaker.rejected},
+    type="counter",
+)
+SUMMARY_CACHE_REQUESTS = CallbackMetric(
+    "summary_cache_requests_total",
+    "In-process summary cache lookups by result: hit, miss, or coalesced "
+    "onto a generation already in flight.",
+    ("result",),
+    lambda: {
+        ("hit",): _summary_cache.hits,
+        ("miss",): _summary_cache.misses,
+        ("coalesced",): _summary_cache.coalesced,
+    },
+    type="counter",
+)
+SUMMARY_CACHE_ENTRIES = CallbackMetric(
+    "summary_cache_entries",
+    "Summaries held in the in-process cache.",
+    (),
+    lambda: {(): _summary_cache.stats()["size"]},
+)
+
+
+def invalidate_summary(patient_id: UUID) -> None:
+    _summary_cache.invalidate(patient_id)
+
+
+def summary_cache_stats() -> dict:
+    return _summary_cache.stats()
+
+
+def llm_breaker_stats() -> dict:
+    return _llm_breaker.stats()
+
+
+def _retry_after_seconds(error: Exception) -> float | None:
+    """Seconds from a rate-limit/overload response's Retry-After header."""
+    if not isinstance(error, openai.APIStatusError):
+        return None
+    value = error.response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _notes_fingerprint(notes: list[Note], note_count: int) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(note_count).encode())
+    for note_id in sorted(str(n.id) for n in notes):
+        digest.update(note_id.encode())
+    return digest.hexdigest()
+
 
 def _get_client() -> AsyncOpenAI:
     global _client
@@ -37,7 +211,14 @@ def _format_date(dt: datetime) -> str:
     return dt.strftime("%B %d, %Y")
 
 
-def generate_template_summary(patient: Patient, notes: list[Note]) -> str:
+def generate_template_summary(
+    patient: Patient, notes: list[Note], note_count: int | None = None
+) -> str:
+    """Render the template summary.
+
+    ``notes`` may be just the most recent notes; ``note_count`` is the
+    patient's total, used for the "additional earlier notes" line.
+    """
     age = _calculate_age(patient.date_of_birth)
     name = f"{patient.first_name} {patient.last_name}"
 
@@ -80,7 +261,8 @@ def generate_template_summary(patient: Patient, notes: list[Note]) -> str:
         notes_section = "\n\nRecent notes:" + "".join(
             f"\n{line}" for line in note_lines
         )
-        older_count = len(sorted_notes) - len(recent)
+        total = len(sorted_notes) if note_count is None else note_count
+        older_count = total - len(recent)
         if older_count > 0:
             notes_section += f"\n\n{older_count} additional earlier note{'s' if older_count > 1 else ''} on file."
     else:
@@ -93,7 +275,7 @@ def _build_patient_data(patient: Patient, notes: list[Note]) -> dict:
     """Build a safe data dict with only clinically relevant fields."""
     age = _calculate_age(patient.date_of_birth)
     sorted_notes = sorted(notes, key=lambda n: n.timestamp)
-    recent_notes = sorted_notes[-5:]
+    recent_notes = sorted_notes[-SUMMARY_NOTE_LIMIT:]
 
     return {
         "name": f"{patient.first_name} {patient.last_name}",
@@ -113,27 +295,30 @@ def _build_patient_data(patient: Patient, notes: list[Note]) -> dict:
     }
 
 
-async def generate_llm_summary(patient: Patient, notes: list[Note]) -> str:
-    client = _get_client()
+SYSTEM_PROMPT = (
+    "You are a clinical documentation assistant. Generate a concise, professional "
+    "clinical summary for a patient based on the provided data. Write in a narrative "
+    "style suitable for a medical chart summary. Do not include any internal system "
+    "identifiers. Keep the summary to 2-3 paragraphs."
+)
+
 
+def _build_messages(patient: Patient, notes: list[Note]) -> list[dict]:
     patient_data = _build_patient_data(patient, notes)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Patient data:\n{patient_data}"},
+    ]
 
-    system_prompt = (
-        "You are a clinical documentation assistant. Generate a concise, professional "
-        "clinical summary for a patient based on the provided data. Write in a narrative "
-        "style suitable for a medical chart summary. Do not include any internal system "
-        "identifiers. Keep the summary to 2-3 paragraphs."
-    )
 
-    user_message = f"Patient data:\n{patient_data}"
+async def generate_llm_summary(patient: Patient, notes: list[Note]) -> str:
+    client = _get_client()
 
-    response = await client.chat.completions.create(
-        model=settings.OPENROUTER_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message},
-        ],
-    )
+    with track_llm():
+        response = await client.chat.completions.create(
+            model=settings.OPENROUTER_MODEL,
+            messages=_build_messages(patient, notes),
+        )
 
     content = response.choices[0].message.content
     if not content:
@@ -141,16 +326,223 @@ async def generate_llm_summary(patient: Patient, notes: list[Note]) -> str:
     return content
 
 
-async def generate_summary(patient: Patient, notes: list[Note]) -> PatientSummary:
-    if settings.SUMMARY_MODE == "llm" and settings.OPENROUTER_API_KEY:
+async def stream_llm_summary(
+    patient: Patient, notes: list[Note]
+) -> AsyncGenerator[str, None]:
+    """Yield the LLM summary as token deltas as they arrive."""
+    client = _get_client()
+
+    # Also counts the consumer's time between deltas (writing them to the
+    # client), which is small next to the provider's.
+    with track_llm():
+        stream = await client.chat.completions.create(
+            model=settings.OPENROUTER_MODEL,
+            messages=_build_messages(patient, notes),
+            stream=True,
+        )
+        async with stream:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+
+async def _within_budget(
+    deltas: AsyncGenerator[str, None], seconds: float
+) -> AsyncIterator[str]:
+    """Re-yield ``deltas``, raising ``TimeoutError`` if any one takes over ``seconds``.
+
+    The wait for the first delta includes the request itself, so this bounds
+    time to first token as well as stalls mid-stream. Time the consumer
+    spends between deltas doesn't count.
+    """
+    try:
+        while True:
+            async with asyncio.timeout(seconds):
+                try:
+                    delta = await anext(deltas)
+                except StopAsyncIteration:
+                    return
+            yield delta
+    finally:
+        await deltas.aclose()
+
+
+def _payload_key(patient: Patient, notes: list[Note], note_count: int) -> str:
+    payload = json.dumps(
+        [
+            settings.SUMMARY_MODE,
+            settings.OPENROUTER_MODEL,
+            _build_patient_data(patient, notes),
+            note_count,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_tag(patient: Patient, notes: list[Note], note_count: int) -> tuple:
+    return (
+        patient.updated_at,
+        _notes_fingerprint(notes, note_count),
+        settings.SUMMARY_MODE,
+    )
+
+
+async def generate_summary(
+    patient: Patient, notes: list[Note], note_count: int | None = None
+) -> PatientSummary:
+    """Summarise a patient from its most recent notes and total note count.
+
+    ``notes`` need not be complete: only the newest ``SUMMARY_NOTE_LIMIT``
+    are used, and ``note_count`` defaults to ``len(notes)``.
+    """
+    if note_count is None:
+        note_count = len(notes)
+    tag = _cache_tag(patient, notes, note_count)
+    cached = _summary_cache.get(patient.id, tag)
+    if cached is not None:
+        return cached.model_copy(update={"cached": True})
+
+    key = _payload_key(patient, notes, note_count)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(
+            _generate_and_cache(patient, notes, note_count, tag)
+        )
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        _summary_cache.coalesced += 1
+    # Shielded so one caller disconnecting doesn't cancel the generation
+    # the other callers are waiting on.
+    return await asyncio.shield(task)
+
+
+async def _generate_and_cache(
+    patient: Patient, notes: list[Note], note_count: int, tag: tuple
+) -> PatientSummary:
+    summary = await _generate_uncached(patient, notes, note_count)
+    # A template fallback for a failed LLM call isn't cached, so the next
+    # view retries the LLM instead of pinning the fallback for the TTL.
+    if not is_fallback(summary):
+        _summary_cache.put(patient.id, tag, summary)
+    return summary
+
+
+def _llm_enabled() -> bool:
+    return settings.SUMMARY_MODE == "llm" and bool(settings.OPENROUTER_API_KEY)
+
+
+def is_fallback(summary: PatientSummary) -> bool:
+    """Whether ``summary`` is the template standing in for a failed LLM call.
+
+    Fallbacks are never cached or stored, so a later request retries the LLM.
+    """
+    return summary.mode == "template" and _llm_enabled()
+
+
+async def _generate_uncached(
+    patient: Patient, notes: list[Note], note_count: int
+) -> PatientSummary:
+    # While the breaker is open this falls straight through to the template
+    # instead of waiting out a timeout against a degraded provider.
+    if _llm_enabled() and _llm_breaker.allow():
         try:
-            summary_text = await generate_llm_summary(patient, notes)
+            summary_text = await asyncio.wait_for(
+                generate_llm_summary(patient, notes),
+                timeout=settings.LLM_LATENCY_BUDGET_SECONDS,
+            )
+            _llm_breaker.record_success()
+            SUMMARY_GENERATIONS.inc("llm")
             return PatientSummary(summary=summary_text, mode="llm")
-        except (openai.APIError, openai.APITimeoutError, ValueError) as e:
+        except LLM_ERRORS as e:
+            _llm_breaker.record_failure(_retry_after_seconds(e))
             logger.warning(
                 "LLM summary generation failed (%s), falling back to template",
                 type(e).__name__,
             )
 
-    summary_text = generate_template_summary(patient, notes)
+    SUMMARY_GENERATIONS.inc("fallback" if _llm_enabled() else "template")
+    summary_text = generate_template_summary(patient, notes, note_count)
     return PatientSummary(summary=summary_text, mode="template")
+
+
+async def stream_summary(
+    patient: Patient, notes: list[Note], note_count: int | None = None
+) -> AsyncIterator[tuple[str, dict]]:
+    """Yield ``(event, data)`` pairs for a streamed summary.
+
+    LLM output arrives as ``delta`` events followed by a final ``done``
+    carrying the complete ``PatientSummary``. If the stream fails partway a
+    ``fallback`` event tells the client to discard the partial text, and
+    ``done`` carries the template summary instead.
+    """
+    if note_count is None:
+        note_count = len(notes)
+    tag = _cache_tag(patient, notes, note_count)
+    cached = _summary_cache.get(patient.id, tag)
+    if cached is not None:
+        yield "done", cached.model_copy(update={"cached": True}).model_dump()
+        return
+
+    if _llm_enabled() and _llm_breaker.allow():
+        parts: list[str] = []
+        try:
+            # A degraded provider would otherwise hold the stream open for
+            # the client's full 30 s timeout before the fallback.
+            async for delta in _within_budget(
+                stream_llm_summary(patient, notes),
+                settings.LLM_LATENCY_BUDGET_SECONDS,
+            ):
+                parts.append(delta)
+                yield "delta", {"text": delta}
+            if not parts:
+                raise ValueError("LLM returned empty content")
+        except LLM_ERRORS as e:
+            _llm_breaker.record_failure(_retry_after_seconds(e))
+            logger.warning(
+                "LLM summary stream failed (%s), falling back to template",
+                type(e).__name__,
+            )
+            yield "fallback", {"reason": type(e).__name__}
+        else:
+            _llm_breaker.record_success()
+            SUMMARY_GENERATIONS.inc("llm")
+            summary = PatientSummary(summary="".join(parts), mode="llm")
+            _summary_cache.put(patient.id, tag, summary)
+            yield "done", summary.model_dump()
+            return
+
+    SUMMARY_GENERATIONS.inc("fallback" if _llm_enabled() else "template")
+    summary = PatientSummary(
+        summary=generate_template_summary(patient, notes, note_count),
+        mode="template",
+    )
+    if not _llm_enabled():
+        _summary_cache.put(patient.id, tag, summary)
+    yield "done", summary.model_dump()
+
+
+async def generate_summaries(
+    patients: list[tuple[Patient, list[Note], int]],
+) -> AsyncIterator[tuple[UUID, PatientSummary]]:
+    """Summarise many patients concurrently, yielding each as it finishes.
+
+    At most ``SUMMARY_BATCH_CONCURRENCY`` generations run at once so a large
+    batch can't flood the LLM provider; each patient falls back to the
+    template on its own.
+    """
+    semaphore = asyncio.Semaphore(settings.SUMMARY_BATCH_CONCURRENCY)
+
+    async def _one(patient: Patient, notes: list[Note], note_count: int):
+        async with semaphore:
+            return patient.id, await generate_summary(patient, notes, note_count)
+
+    tasks = [asyncio.create_task(_one(*inputs)) for inputs in patients]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
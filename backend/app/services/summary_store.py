@@ -0,0 +1,228 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    and_,
+    case,
+    delete,
+    func,
+    literal,
+    null,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.patient import Patient
+from app.models.summary import SummaryJob, SummaryRecord
+from app.schemas.summary import PatientSummary
+
+
+def _upsert_jobs(stmt: Insert) -> Insert:
+    # Re-enqueueing a job that a worker has already claimed resets its lease
+    # and timestamp, so the worker's completion won't delete it and the
+    # newer change still gets a fresh summary.
+    return stmt.on_conflict_do_update(
+        index_elements=[SummaryJob.patient_id],
+        set_={
+            "enqueued_at": stmt.excluded.enqueued_at,
+            "locked_until": None,
+            "attempts": 0,
+        },
+    )
+
+
+async def enqueue_summary_job(db: AsyncSession, patient_id: UUID) -> None:
+    """Queue a regeneration in the caller's transaction."""
+    await db.execute(
+        _upsert_jobs(
+            insert(SummaryJob).values(
+                patient_id=patient_id,
+                enqueued_at=func.clock_timestamp(),
+                locked_until=None,
+                attempts=0,
+            )
+        )
+    )
+
+
+def enqueue_summary_jobs_for(patient_ids: ColumnElement[UUID]) -> Insert:
+    """An INSERT queuing a regeneration for each of ``patient_ids``.
+
+    For embedding as a CTE in the statement that changed those patients,
+    e.g. over the ids an ``UPDATE ... RETURNING`` produced, so the write and
+    its job cost one round trip.
+    """
+    return _upsert_jobs(
+        insert(SummaryJob).from_select(
+            ["patient_id", "enqueued_at", "locked_until", "attempts"],
+            select(patient_ids, func.clock_timestamp(), null(), literal(0)),
+        )
+    )
+
+
+async def get_stored_summary(
+    db: AsyncSession, patient_id: UUID
+) -> PatientSummary | None:
+    """Stored summary plus whether a regeneration is pending, in one lookup."""
+    result = await db.execute(
+        select(SummaryRecord, SummaryJob.enqueued_at)
+        .outerjoin(SummaryJob, SummaryJob.patient_id == SummaryRecord.patient_id)
+        .where(SummaryRecord.patient_id == patient_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    record, pending_since = row
+    return PatientSummary(
+        summary=record.summary,
+        mode=record.mode,
+        cached=True,
+        stale=pending_since is not None,
+        generated_at=record.generated_at,
+    )
+
+
+async def save_summary(
+    db: AsyncSession, patient_id: UUID, summary: PatientSummary
+) -> None:
+    stmt = insert(SummaryRecord).values(
+        patient_id=patient_id,
+        summary=summary.summary,
+        mode=summary.mode,
+        generated_at=func.now(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SummaryRecord.patient_id],
+        set_={
+            "summary": stmt.excluded.summary,
+            "mode": stmt.excluded.mode,
+            "generated_at": stmt.excluded.generated_at,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def claim_summary_generation(
+    db: AsyncSession, patient_id: UUID, lease_seconds: float
+) -> datetime | None:
+    """Lease a patient's summary generation to the caller, across processes.
+
+    Upserts the patient's job row with a lease unless a request or worker
+    in any process holds an unexpired one, so only one of them calls the
+    LLM. Returns the job's ``enqueued_at`` to hand to
+    ``complete_summary_jobs`` once the summary is saved, or ``None`` if the
+    generation is already leased or the patient doesn't exist.
+    """
+    now = func.clock_timestamp()
+    stmt = insert(SummaryJob).from_select(
+        ["patient_id", "enqueued_at", "locked_until", "attempts"],
+        select(
+            Patient.id, now, now + timedelta(seconds=lease_seconds), literal(0)
+        ).where(Patient.id == patient_id),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SummaryJob.patient_id],
+        set_={"locked_until": stmt.excluded.locked_until},
+        where=(SummaryJob.locked_until.is_(None)) | (SummaryJob.locked_until < now),
+    ).returning(SummaryJob.enqueued_at)
+    return await db.scalar(stmt)
+
+
+async def wait_for_summary_generation(
+    db: AsyncSession,
+    patient_id: UUID,
+    lease_seconds: float,
+    timeout: float,
+    poll_seconds: float = 0.1,
+) -> tuple[PatientSummary | None, datetime | None]:
+    """Wait out a summary generation leased by another process.
+
+    Polls until the summary is stored, or the lease is released or expires
+    and this caller claims it instead, or ``timeout`` passes. Returns
+    ``(stored_summary, lease)``, at most one of them set. Commits after each
+    poll so no connection is held while waiting.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll_seconds)
+        stored = await get_stored_summary(db, patient_id)
+        lease = None
+        if stored is None:
+            lease = await claim_summary_generation(db, patient_id, lease_seconds)
+        await db.commit()
+        if stored is not None or lease is not None:
+            return stored, lease
+    return None, None
+
+
+async def claim_summary_jobs(
+    db: AsyncSession,
+    limit: int,
+    lease_seconds: float,
+    max_attempts: int | None = None,
+    backoff_seconds: float = 0.0,
+    max_backoff_seconds: float = 0.0,
+) -> list[tuple[UUID, datetime]]:
+    """Lease up to ``limit`` due jobs, oldest first.
+
+    ``SKIP LOCKED`` lets several workers claim concurrently without
+    blocking each other; the lease lets an abandoned or failed claim be
+    retried once it expires. A job already claimed ``max_attempts`` times
+    is leased for ``backoff_seconds`` instead, doubling with each further
+    claim up to ``max_backoff_seconds``, so a job that keeps failing stays
+    queued and keeps being retried, just less often. Returns
+    ``(patient_id, enqueued_at)`` pairs to hand back to
+    ``complete_summary_jobs``.
+    """
+    now = func.clock_timestamp()
+    lease = literal(timedelta(seconds=lease_seconds))
+    if max_attempts is not None:
+        # Capped so a long-failing job can't overflow the double.
+        doublings = func.least(SummaryJob.attempts - max_attempts, 30)
+        backoff = func.least(
+            literal(backoff_seconds, Float) * func.power(2, doublings),
+            literal(max_backoff_seconds, Float),
+        )
+        lease = case(
+            (
+                SummaryJob.attempts >= max_attempts,
+                func.make_interval(0, 0, 0, 0, 0, 0, backoff),
+            ),
+            else_=lease,
+        )
+    due = (
+        select(SummaryJob.patient_id)
+        .where((SummaryJob.locked_until.is_(None)) | (SummaryJob.locked_until < now))
+        .order_by(SummaryJob.enqueued_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(SummaryJob)
+        .where(SummaryJob.patient_id.in_(due))
+        .values(locked_until=now + lease, attempts=SummaryJob.attempts + 1)
+        .returning(SummaryJob.patient_id, SummaryJob.enqueued_at)
+    )
+    return [(patient_id, enqueued_at) for patient_id, enqueued_at in result.all()]
+
+
+async def complete_summary_jobs(
+    db: AsyncSession, jobs: list[tuple[UUID, datetime]]
+) -> None:
+    """Delete finished jobs unless they were re-enqueued while running."""
+    for patient_id, enqueued_at in jobs:
+        await db.execute(
+            delete(SummaryJob).where(
+                and_(
+                    SummaryJob.patient_id == patient_id,
+                    SummaryJob.enqueued_at == enqueued_at,
+                )
+            )
+        )
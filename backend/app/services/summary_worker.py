@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from contextlib import suppress
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.services import note_service, summary_store
+from app.services.summary_service import generate_summaries, is_fallback
+
+logger = logging.getLogger(__name__)
+
+
+async def process_summary_jobs(
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+) -> int:
+    """Regenerate stored summaries for one batch of queued jobs.
+
+    Claims are committed before generation starts, and results are saved in
+    one short transaction once the whole batch has been generated, so no
+    transaction or row lock is held across LLM calls. A job whose LLM call
+    fell back to the template is left queued and retried when its lease
+    expires, backing off once it has failed ``SUMMARY_WORKER_MAX_ATTEMPTS``
+    times. Returns the number of jobs processed.
+    """
+    async with session_factory() as db:
+        jobs = await summary_store.claim_summary_jobs(
+            db,
+            limit=settings.SUMMARY_WORKER_BATCH_SIZE,
+            lease_seconds=settings.SUMMARY_WORKER_LEASE_SECONDS,
+            max_attempts=settings.SUMMARY_WORKER_MAX_ATTEMPTS,
+            backoff_seconds=settings.SUMMARY_WORKER_BACKOFF_SECONDS,
+            max_backoff_seconds=settings.SUMMARY_WORKER_MAX_BACKOFF_SECONDS,
+        )
+        await db.commit()
+        if not jobs:
+            return 0
+
+        patient_ids = [patient_id for patient_id, _ in jobs]
+        inputs = await note_service.get_summary_inputs(db, patient_ids)
+        await db.commit()
+
+        batch = [inputs[pid] for pid in patient_ids if pid in inputs]
+        summaries = [item async for item in generate_summaries(batch)]
+
+        failed = set()
+        for patient_id, summary in summaries:
+            if is_fallback(summary):
+                failed.add(patient_id)
+            else:
+                await summary_store.save_summary(db, patient_id, summary)
+        if failed:
+            logger.warning(
+                "LLM summary failed for %d of %d queued patients; will retry",
+                len(failed),
+                len(jobs),
+            )
+        await summary_store.complete_summary_jobs(
+            db, [job for job in jobs if job[0] not in failed]
+        )
+        await db.commit()
+    return len(jobs)
+
+
+async def run_summary_worker(stop: asyncio.Event) -> None:
+    """Drain the summary job queue until ``stop`` is set."""
+    while not stop.is_set():
+        try:
+            processed = await process_summary_jobs()
+        except Exception:
+            logger.exception("Summary worker batch failed")
+            processed = 0
+        if processed == 0:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(
+                    stop.wait(), timeout=settings.SUMMARY_WORKER_POLL_SECONDS
+                )
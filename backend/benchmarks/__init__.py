@@ -0,0 +1,4 @@
+"""HTTP load and micro benchmarks for the API.
+
+Run ``python -m benchmarks --help`` from the backend directory.
+"""
@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.compare import find_regressions
+from benchmarks.runner import run_workload
+from benchmarks.workloads import WORKLOADS, load_fixtures
+
+
+def _client(target: str, concurrency: int) -> httpx.AsyncClient:
+    if target == "asgi":
+        # Imported lazily so comparing result files doesn't need app settings.
+        from app.main import app
+
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        )
+    return httpx.AsyncClient(
+        base_url=target,
+        limits=httpx.Limits(max_connections=concurrency),
+        timeout=60.0,
+    )
+
+
+async def _run_http(args: argparse.Namespace) -> dict:
+    async with _client(args.target, args.concurrency) as client:
+        fixtures = await load_fixtures(client)
+        return await run_workload(
+            client,
+            WORKLOADS[args.workload],
+            fixtures,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            warmup=args.warmup,
+            seed=args.seed,
+        )
+
+
+def _print_report(result: dict) -> None:
+    print(
+        f"{'route':<36} {'reqs':>7} {'err':>5} {'rps':>9} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for route, stats in {
+        **result.get("routes", {}),
+        "total": result.get("total"),
+    }.items():
+        if not stats:
+            continue
+        print(
+            f"{route:<36} {stats['requests']:>7} {stats['errors']:>5} "
+            f"{stats['rps']:>9.1f} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+            f"{stats['p99_ms']:>8.2f}"
+        )
+    for name, stats in result.get("micro", {}).items():
+        print(f"{name:<36} {stats['ns_per_op']:>12,} ns/op")
+
+
+def _compare(result: dict, baseline_path: str, tolerance: float) -> int:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = find_regressions(result, baseline, tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {baseline_path}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions against {baseline_path}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run HTTP workload and micro benchmarks against the API.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run benchmarks and write a result file")
+    run.add_argument(
+        "--target",
+        default="asgi",
+        help="'asgi' to drive the app in-process, or a base URL such as "
+        "http://localhost:8000 (default: asgi)",
+    )
+    run.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed")
+    run.add_argument("--concurrency", type=int, default=10)
+    run.add_argument("--duration", type=float, default=10.0, help="seconds")
+    run.add_argument("--warmup", type=float, default=1.0, help="seconds")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--no-http", action="store_true", help="microbenchmarks only")
+    run.add_argument("--no-micro", action="store_true", help="HTTP workload only")
+    run.add_argument("--output", default="benchmark-results.json")
+    run.add_argument("--baseline", help="result file to compare against")
+    run.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed relative slowdown before a metric counts as a "
+        "regression (default: 0.2)",
+    )
+
+    compare = sub.add_parser("compare", help="compare two result files")
+    compare.add_argument("result")
+    compare.add_argument("baseline")
+    compare.add_argument("--tolerance", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.result) as f:
+            result = json.load(f)
+        _print_report(result)
+        return _compare(result, args.baseline, args.tolerance)
+
+    # Per-request logs would drown the report (and, in-process, skew it).
+    for name in ("dash_md.access", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    result: dict = {
+        "meta": {
+            "target": args.target,
+            "workload": args.workload,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+    }
+    if not args.no_http:
+        result.update(asyncio.run(_run_http(args)))
+    if not args.no_micro:
+        from benchmarks.micro import run_micro
+
+        result["micro"] = run_micro()
+
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+        f.write("\n")
+    _print_report(result)
+    print(f"\nWrote {args.output}")
+    if args.baseline:
+        return _compare(result, args.baseline, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
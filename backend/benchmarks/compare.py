@@ -0,0 +1,61 @@
+"""Compare a benchmark result file against a stored baseline."""
+
+# (metric, higher_is_worse) pairs checked for every route and microbenchmark.
+LATENCY_METRICS = (("p50_ms", True), ("p95_ms", True), ("p99_ms", True))
+THROUGHPUT_METRICS = (("rps", False),)
+MICRO_METRICS = (("ns_per_op", True),)
+
+
+def _check(
+    name: str,
+    current: dict,
+    baseline: dict,
+    metrics: tuple[tuple[str, bool], ...],
+    tolerance: float,
+) -> list[str]:
+    regressions = []
+    for metric, higher_is_worse in metrics:
+        if metric not in current or metric not in baseline or not baseline[metric]:
+            continue
+        change = (current[metric] - baseline[metric]) / baseline[metric]
+        if (change if higher_is_worse else -change) > tolerance:
+            regressions.append(
+                f"{name} {metric}: {baseline[metric]} -> {current[metric]} "
+                f"({change:+.0%}, tolerance {tolerance:.0%})"
+            )
+    return regressions
+
+
+def find_regressions(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Describe every metric that got worse than ``baseline`` by more than ``tolerance``.
+
+    Only routes and microbenchmarks present in both files are compared, so a
+    baseline recorded with a different workload mix still checks the
+    overlap. Per-route throughput depends on the mix and concurrency, so it
+    is only compared when both match. A route that starts returning errors
+    is always a regression.
+    """
+    regressions = []
+    same_load = all(
+        current.get("meta", {}).get(key) == baseline.get("meta", {}).get(key)
+        for key in ("workload", "concurrency")
+    )
+    route_metrics = LATENCY_METRICS + (THROUGHPUT_METRICS if same_load else ())
+    current_routes = current.get("routes", {})
+    for route, base in baseline.get("routes", {}).items():
+        if route not in current_routes:
+            continue
+        stats = current_routes[route]
+        if stats.get("errors", 0) > base.get("errors", 0):
+            regressions.append(
+                f"{route} errors: {base.get('errors', 0)} -> {stats['errors']}"
+            )
+        regressions += _check(route, stats, base, route_metrics, tolerance)
+
+    current_micro = current.get("micro", {})
+    for name, base in baseline.get("micro", {}).items():
+        if name in current_micro:
+            regressions += _check(
+                name, current_micro[name], base, MICRO_METRICS, tolerance
+            )
+    return regressions
@@ -0,0 +1,68 @@
+import timeit
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from app.models.note import Note
+from app.models.patient import Patient
+from app.responses import ORJSONResponse, dump_attributes
+from app.schemas.patient import PaginatedResponse, PatientResponse
+from app.seed import SEED_NOTES, SEED_PATIENTS
+from app.services.summary_service import generate_template_summary
+
+_CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _patients() -> list[Patient]:
+    return [
+        Patient(**data, created_at=_CREATED, updated_at=_CREATED)
+        for data in SEED_PATIENTS
+    ]
+
+
+def _notes_for(patient: Patient) -> list[Note]:
+    return [
+        Note(**data, created_at=_CREATED)
+        for data in SEED_NOTES
+        if data["patient_id"] == patient.id
+    ]
+
+
+def _time(fn: Callable[[], object], repeat: int = 5) -> dict:
+    """Best-of-``repeat`` time per call, each repeat running ~0.2s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"ns_per_op": round(best * 1e9), "loops": number}
+
+
+def run_micro() -> dict[str, dict]:
+    """CPU-only benchmarks of hot paths that don't touch the database."""
+    patients = _patients()
+    patient = patients[0]
+    notes = _notes_for(patient)
+    page = patients[:20]
+
+    return {
+        "generate_template_summary": _time(
+            lambda: generate_template_summary(patient, notes)
+        ),
+        "PatientResponse.model_validate": _time(
+            lambda: PatientResponse.model_validate(patient)
+        ),
+        "PaginatedResponse.model_dump_json[20]": _time(
+            lambda: PaginatedResponse(
+                items=page, total=len(page), limit=20, offset=0
+            ).model_dump_json()
+        ),
+        # What GET /api/patients actually does with a page.
+        "ORJSONResponse.body[20]": _time(
+            lambda: (
+                ORJSONResponse(
+                    {
+                        "items": [dump_attributes(p, PatientResponse) for p in page],
+                        "total": len(page),
+                    }
+                ).body
+            )
+        ),
+    }
@@ -0,0 +1,90 @@
+import asyncio
+import math
+import random
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.workloads import Fixtures, Operation
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+async def run_workload(
+    client: httpx.AsyncClient,
+    mix: list[tuple[Operation, int]],
+    fixtures: Fixtures,
+    concurrency: int,
+    duration: float,
+    warmup: float = 1.0,
+    seed: int = 0,
+) -> dict:
+    """Drive the weighted ``mix`` from ``concurrency`` workers for ``duration`` seconds.
+
+    Each worker issues requests back to back, picking operations by weight.
+    Requests that complete during the first ``warmup`` seconds are not
+    recorded. A response with status >= 400, or a transport error, counts
+    as an error and its latency is excluded.
+    """
+    operations = [op for op, _ in mix]
+    weights = [weight for _, weight in mix]
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    start = time.perf_counter()
+    record_from = start + warmup
+    stop_at = record_from + duration
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            op = rng.choices(operations, weights)[0]
+            path = op.path(rng, fixtures)
+            sent = time.perf_counter()
+            if sent >= stop_at:
+                return
+            try:
+                response = await client.get(path)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            done = time.perf_counter()
+            if done < record_from:
+                continue
+            if failed:
+                errors[op.route] += 1
+            else:
+                latencies[op.route].append(done - sent)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - record_from
+
+    routes = {
+        op.route: summarize(latencies[op.route], errors[op.route], elapsed)
+        for op in operations
+    }
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "routes": routes,
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+    }
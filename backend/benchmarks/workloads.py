@@ -0,0 +1,90 @@
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import httpx
+
+
+@dataclass
+class Fixtures:
+    """Ids and search terms discovered from the target before the run."""
+
+    patient_ids: list[str]
+    search_terms: list[str]
+
+
+@dataclass(frozen=True)
+class Operation:
+    # Route template; latencies are aggregated per route, not per URL.
+    route: str
+    path: Callable[[random.Random, Fixtures], str]
+
+
+def _patient(rng: random.Random, fx: Fixtures) -> str:
+    return rng.choice(fx.patient_ids)
+
+
+LIST_PATIENTS = Operation(
+    "GET /api/patients",
+    lambda rng, fx: (
+        "/api/patients?limit=20&sort_by="
+        + rng.choice(["last_name", "created_at", "last_visit_date"])
+    ),
+)
+SEARCH_PATIENTS = Operation(
+    "GET /api/patients?search",
+    lambda rng, fx: f"/api/patients?limit=20&search={rng.choice(fx.search_terms)}",
+)
+PATIENT_STATS = Operation(
+    "GET /api/patients/stats", lambda rng, fx: "/api/patients/stats"
+)
+GET_PATIENT = Operation(
+    "GET /api/patients/{id}", lambda rng, fx: f"/api/patients/{_patient(rng, fx)}"
+)
+LIST_NOTES = Operation(
+    "GET /api/patients/{id}/notes",
+    lambda rng, fx: f"/api/patients/{_patient(rng, fx)}/notes",
+)
+GET_SUMMARY = Operation(
+    "GET /api/patients/{id}/summary",
+    lambda rng, fx: f"/api/patients/{_patient(rng, fx)}/summary",
+)
+
+# Request mixes as (operation, relative weight) pairs.
+WORKLOADS: dict[str, list[tuple[Operation, int]]] = {
+    # Dashboard and list browsing: mostly lists and detail views.
+    "browse": [
+        (LIST_PATIENTS, 30),
+        (SEARCH_PATIENTS, 15),
+        (PATIENT_STATS, 10),
+        (GET_PATIENT, 25),
+        (LIST_NOTES, 20),
+    ],
+    # Opening patient charts: detail, notes and summary together.
+    "chart": [(GET_PATIENT, 35), (LIST_NOTES, 35), (GET_SUMMARY, 30)],
+    "summary": [(GET_SUMMARY, 1)],
+    "mixed": [
+        (LIST_PATIENTS, 20),
+        (SEARCH_PATIENTS, 10),
+        (PATIENT_STATS, 5),
+        (GET_PATIENT, 25),
+        (LIST_NOTES, 20),
+        (GET_SUMMARY, 20),
+    ],
+}
+
+
+async def load_fixtures(client: httpx.AsyncClient, sample: int = 100) -> Fixtures:
+    response = await client.get(
+        "/api/patients", params={"limit": sample, "include_total": "false"}
+    )
+    response.raise_for_status()
+    items = response.json()["items"]
+    if not items:
+        raise RuntimeError(
+            "Target has no patients; load some with `python -m app.seed` first"
+        )
+    return Fixtures(
+        patient_ids=[p["id"] for p in items],
+        search_terms=sorted({p["last_name"][:3].lower() for p in items}),
+    )
@@ -4,11 +4,13 @@ from collections.abc import AsyncGenerator
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from app.config import settings
 from app.database import Base, get_db
 from app.main import app
+from app.services import patient_service, summary_service
 
 
 def _test_db_url() -> str:
@@ -32,6 +34,7 @@ TestSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 async def setup_db():
     """Create tables once for the test session, drop when done."""
     async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
     yield
@@ -46,6 +49,9 @@ async def clean_tables():
     async with engine.begin() as conn:
         for table in reversed(Base.metadata.sorted_tables):
             await conn.execute(table.delete())
+    patient_service._stats_cache = None
+    summary_service._summary_cache.clear()
+    summary_service._llm_breaker.reset()
 
 
 @pytest.fixture
@@ -0,0 +1,60 @@
+from benchmarks.compare import find_regressions
+from benchmarks.runner import percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([0.5], 99) == 0.5
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize_reports_milliseconds():
+    stats = summarize([0.001, 0.002, 0.003, 0.004], errors=1, elapsed=2.0)
+    assert stats["requests"] == 4
+    assert stats["errors"] == 1
+    assert stats["rps"] == 2.0
+    assert stats["p50_ms"] == 2.0
+    assert stats["max_ms"] == 4.0
+
+
+def test_find_regressions():
+    baseline = {
+        "routes": {
+            "GET /a": {
+                "p50_ms": 10,
+                "p95_ms": 20,
+                "p99_ms": 30,
+                "rps": 100,
+                "errors": 0,
+            },
+            "GET /gone": {"p50_ms": 1, "p95_ms": 1, "p99_ms": 1, "rps": 1, "errors": 0},
+        },
+        "micro": {"fn": {"ns_per_op": 1000}},
+    }
+    current = {
+        "routes": {
+            "GET /a": {
+                "p50_ms": 11,
+                "p95_ms": 30,
+                "p99_ms": 30,
+                "rps": 70,
+                "errors": 2,
+            },
+        },
+        "micro": {"fn": {"ns_per_op": 1100}},
+    }
+
+    regressions = find_regressions(current, baseline, tolerance=0.2)
+    assert len(regressions) == 3
+    assert regressions[0].startswith("GET /a errors")
+    assert any("p95_ms" in line for line in regressions)
+    assert any("rps" in line for line in regressions)
+    assert find_regressions(baseline, baseline, tolerance=0.0) == []
+
+    current["meta"] = {"workload": "browse"}
+    assert not any(
+        "rps" in line for line in find_regressions(current, baseline, tolerance=0.2)
+    )
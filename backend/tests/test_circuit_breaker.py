@@ -0,0 +1,90 @@
+from app.services.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(clock):
+    return CircuitBreaker(
+        "test",
+        failure_rate=0.5,
+        min_requests=4,
+        window_seconds=60,
+        cooldown_seconds=30,
+        clock=clock,
+    )
+
+
+def test_opens_at_failure_rate():
+    breaker = make_breaker(FakeClock())
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow() is False
+
+
+def test_needs_minimum_requests():
+    breaker = make_breaker(FakeClock())
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_old_outcomes_leave_the_window():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 120
+    for _ in range(3):
+        breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_probe_closes_on_success():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 31
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.transitions == {
+        "closed->open": 1,
+        "open->half_open": 1,
+        "half_open->closed": 1,
+    }
+
+
+def test_half_open_probe_failure_reopens():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 31
+    assert breaker.allow() is True
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_retry_after_extends_open_period():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    breaker.record_failure(retry_after=90)
+    assert breaker.state == "open"
+    clock.now = 60
+    assert breaker.state == "open"
+    clock.now = 91
+    assert breaker.state == "half_open"
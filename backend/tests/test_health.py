@@ -1,3 +1,30 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from unittest.mock import patch
+
+import httpx
+from sqlalchemy import text
+from starlette.responses import PlainTextResponse
+
+from app.instrumentation import current_timings, request_timings, track_llm
+from app.metrics import (
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    LLM_REQUEST_DURATION,
+    render_metrics,
+)
+from app.middleware import (
+    RequestLoggingMiddleware,
+    logger as access_logger,
+    start_access_log,
+    stop_access_log,
+)
+from tests.conftest import TestSessionLocal, create_test_patient
+
+
 async def test_health_check(client):
     response = await client.get("/api/health")
     assert response.status_code == 200
@@ -7,3 +34,177 @@ async def test_health_check(client):
 async def test_request_id_header(client):
     response = await client.get("/api/health")
     assert "x-request-id" in response.headers
+
+
+async def test_request_id_echoed_when_valid(client):
+    request_id = str(uuid.uuid4())
+    response = await client.get("/api/health", headers={"X-Request-ID": request_id})
+    assert response.headers["x-request-id"] == request_id
+
+    response = await client.get("/api/health", headers={"X-Request-ID": "nope"})
+    assert response.headers["x-request-id"] != "nope"
+    uuid.UUID(response.headers["x-request-id"])
+
+
+def _access_entries(caplog) -> list[dict]:
+    return [
+        json.loads(r.getMessage()) for r in caplog.records if r.name == "dash_md.access"
+    ]
+
+
+async def test_access_log_sampling(client, caplog):
+    caplog.set_level(logging.INFO, logger="dash_md.access")
+    with patch("app.middleware.random.random", return_value=0.5):
+        await client.get("/api/health")
+        await client.get(f"/api/patients/{uuid.uuid4()}")
+        await client.get("/api/patients")
+
+    entries = _access_entries(caplog)
+    assert [(e["path"], e["status_code"]) for e in entries] == [
+        (entries[0]["path"], 404),
+        ("/api/patients", 200),
+    ]
+    assert entries[1]["request_id"]
+
+
+async def test_access_log_goes_through_queue(client):
+    records = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            records.append(self.format(record))
+
+    root = logging.getLogger()
+    handler = Collect()
+    root.addHandler(handler)
+    listener = start_access_log()
+    try:
+        await client.get("/api/patients")
+        assert access_logger.propagate is False
+    finally:
+        stop_access_log(listener)
+        root.removeHandler(handler)
+
+    assert access_logger.propagate is True
+    assert json.loads(records[-1])["path"] == "/api/patients"
+
+
+async def test_server_timing_counts_queries(client, caplog):
+    caplog.set_level(logging.INFO, logger="dash_md.access")
+    response = await client.get("/api/patients")
+
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert "llm;dur=0.00" in timing
+    entry = _access_entries(caplog)[-1]
+    assert entry["db_queries"] >= 2
+    assert entry["db_ms"] > 0
+    assert entry["llm_ms"] == 0
+    assert f'desc="{entry["db_queries"]} queries"' in timing
+
+
+async def test_track_llm_charges_current_request():
+    with track_llm():
+        pass  # outside a request: no-op
+
+    with request_timings("req") as timings:
+        with track_llm():
+            await asyncio.sleep(0.01)
+        assert current_timings() is timings
+    assert timings.llm_seconds >= 0.01
+    assert current_timings() is None
+
+
+async def test_query_budget_flags_request(caplog):
+    async def endpoint(scope, receive, send):
+        async with TestSessionLocal() as db:
+            for _ in range(3):
+                await db.execute(text("SELECT 1"))
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    caplog.set_level(logging.INFO, logger="dash_md.access")
+    transport = httpx.ASGITransport(
+        app=RequestLoggingMiddleware(endpoint, query_budget=2)
+    )
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+        response = await c.get("/n-plus-one")
+
+    assert 'desc="3 queries"' in response.headers["server-timing"]
+    record = [r for r in caplog.records if r.name == "dash_md.access"][-1]
+    assert record.levelno == logging.WARNING
+    assert json.loads(record.getMessage())["query_budget_exceeded"] is True
+
+
+async def test_pool_health(client):
+    response = await client.get("/api/health/pool")
+    assert response.status_code == 200
+    data = response.json()
+    for key in ("size", "checked_out", "idle", "overflow", "waiting"):
+        assert data[key] >= 0
+    assert data["checkout_wait_ms"] >= 0
+
+
+def _sample(body: str, line_prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"no sample {line_prefix!r}")
+
+
+async def test_metrics_label_requests_by_route_template(client):
+    patient = await create_test_patient(client)
+    await client.get(f"/api/patients/{patient['id']}")
+    await client.get(f"/api/patients/{uuid.uuid4()}")
+    await client.get("/api/no-such-route")
+
+    response = await client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    route = 'method="GET",route="/api/patients/{patient_id}"'
+    assert _sample(body, f'http_requests_total{{{route},status="200"}}') >= 1
+    assert _sample(body, f'http_requests_total{{{route},status="404"}}') >= 1
+    assert str(patient["id"]) not in body
+    assert 'route="unmatched"' in body
+    count = _sample(body, f"http_request_duration_seconds_count{{{route}}}")
+    inf = _sample(body, f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}')
+    assert inf == count >= 2
+    # The scrape itself is the only request in flight.
+    assert _sample(body, "http_requests_in_flight") == 1
+    assert _sample(body, 'db_pool_connections{state="idle"}') >= 0
+    assert _sample(body, "db_pool_checkouts_total") >= 0
+
+
+async def test_track_llm_records_latency_histogram():
+    before = LLM_REQUEST_DURATION.values.get(("error",), [0.0] * 3)[-1]
+    try:
+        with track_llm():
+            raise TimeoutError
+    except TimeoutError:
+        pass
+    assert LLM_REQUEST_DURATION.values[("error",)][-1] == before + 1
+
+
+async def test_metrics_merge_worker_snapshots(tmp_path):
+    key = ["GET", "/api/health", "200"]
+    own = HTTP_REQUESTS.values.get(tuple(key), 0)
+    other = {
+        "http_requests_total": [[key, 5.0]],
+        "http_requests_in_flight": [[[], 3.0]],
+    }
+    # One live worker (our parent) and one that has exited.
+    live, dead = os.getppid(), 2**22 + 1
+    for pid in (live, dead):
+        (tmp_path / f"{pid}.json").write_text(json.dumps(other))
+
+    with patch("app.metrics.settings") as mock_settings:
+        mock_settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+        body = await render_metrics()
+
+    requests = _sample(
+        body, 'http_requests_total{method="GET",route="/api/health",status="200"}'
+    )
+    assert requests == own + 10
+    in_flight = HTTP_REQUESTS_IN_FLIGHT.values.get((), 0)
+    # Only the live worker's gauge is added.
+    assert _sample(body, "http_requests_in_flight") == in_flight + 3
@@ -1,6 +1,8 @@
 import uuid
 
-from tests.conftest import create_test_patient
+from app.services import note_service
+from app.services.pagination import encode_cursor
+from tests.conftest import TestSessionLocal, create_test_patient
 
 
 async def create_test_note(client, patient_id):
@@ -15,7 +17,14 @@ async def create_test_note(client, patient_id):
 
 async def test_create_note(client):
     patient = await create_test_patient(client)
-    note = await create_test_note(client, patient["id"])
+    response = await client.post(
+        f"/api/patients/{patient['id']}/notes",
+        json={"content": "Test clinical note", "timestamp": "2025-01-15T10:00:00Z"},
+    )
+    assert response.status_code == 201
+    # The insert, RETURNING and summary job upsert are one statement.
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+    note = response.json()
     assert "id" in note
     assert note["content"] == "Test clinical note"
     assert note["patient_id"] == patient["id"]
@@ -51,7 +60,7 @@ async def test_list_notes(client):
 
     response = await client.get(f"/api/patients/{pid}/notes")
     assert response.status_code == 200
-    notes = response.json()
+    notes = response.json()["items"]
     assert len(notes) == 2
     assert notes[0]["content"] == "Second note"
     assert notes[1]["content"] == "First note"
@@ -61,7 +70,7 @@ async def test_list_notes_empty(client):
     patient = await create_test_patient(client)
     response = await client.get(f"/api/patients/{patient['id']}/notes")
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json() == {"items": [], "next_cursor": None}
 
 
 async def test_delete_note(client):
@@ -70,9 +79,10 @@ async def test_delete_note(client):
 
     response = await client.delete(f"/api/patients/{patient['id']}/notes/{note['id']}")
     assert response.status_code == 204
+    assert 'desc="1 queries"' in response.headers["server-timing"]
 
     response = await client.get(f"/api/patients/{patient['id']}/notes")
-    assert response.json() == []
+    assert response.json()["items"] == []
 
 
 async def test_delete_note_wrong_patient(client):
@@ -86,6 +96,114 @@ async def test_delete_note_wrong_patient(client):
     assert response.status_code == 404
 
 
+async def test_list_notes_cursor_pagination(client):
+    patient = await create_test_patient(client)
+    pid = patient["id"]
+    # Two notes share a timestamp, so paging has to break ties on id.
+    for day in (10, 11, 11, 12, 13):
+        await client.post(
+            f"/api/patients/{pid}/notes",
+            json={"content": f"Day {day}", "timestamp": f"2025-01-{day}T10:00:00Z"},
+        )
+
+    seen = []
+    params: dict = {"limit": 2}
+    while True:
+        response = await client.get(f"/api/patients/{pid}/notes", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen += page["items"]
+        if page["next_cursor"] is None:
+            break
+        params["after"] = page["next_cursor"]
+
+    assert [n["content"] for n in seen] == [
+        "Day 13",
+        "Day 12",
+        "Day 11",
+        "Day 11",
+        "Day 10",
+    ]
+    assert len({n["id"] for n in seen}) == 5
+
+
+async def test_list_notes_date_range(client):
+    patient = await create_test_patient(client)
+    pid = patient["id"]
+    for day in (10, 12, 14):
+        await client.post(
+            f"/api/patients/{pid}/notes",
+            json={"content": f"Day {day}", "timestamp": f"2025-01-{day}T10:00:00Z"},
+        )
+
+    response = await client.get(
+        f"/api/patients/{pid}/notes",
+        params={"from": "2025-01-11T00:00:00Z", "to": "2025-01-14T00:00:00Z"},
+    )
+    assert [n["content"] for n in response.json()["items"]] == ["Day 12"]
+
+    response = await client.get(
+        f"/api/patients/{pid}/notes",
+        params={"from": "2025-01-14T00:00:00Z", "to": "2025-01-11T00:00:00Z"},
+    )
+    assert response.status_code == 400
+
+    response = await client.get(
+        f"/api/patients/{pid}/notes", params={"after": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+    cursor = encode_cursor({"t": "2025-01-12T00:00:00+00:00", "id": 5})
+    response = await client.get(f"/api/patients/{pid}/notes", params={"after": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+async def test_list_notes_etag(client):
+    patient = await create_test_patient(client)
+    pid = patient["id"]
+    note = await create_test_note(client, pid)
+    url = f"/api/patients/{pid}/notes"
+
+    etag = (await client.get(url)).headers["etag"]
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await create_test_note(client, pid)
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
+
+    etag = response.headers["etag"]
+    await client.delete(f"{url}/{note['id']}")
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    await client.delete(f"/api/patients/{pid}")
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 404
+
+
+async def test_notes_version_counts_note_writes(client):
+    patient = await create_test_patient(client)
+    pid = uuid.UUID(patient["id"])
+
+    async def version():
+        async with TestSessionLocal() as db:
+            return await note_service.get_notes_version(db, pid)
+
+    assert await version() == 0
+    note = await create_test_note(client, patient["id"])
+    await create_test_note(client, patient["id"])
+    assert await version() == 2
+    await client.delete(f"/api/patients/{pid}/notes/{note['id']}")
+    assert await version() == 3
+
+    async with TestSessionLocal() as db:
+        assert await note_service.get_notes_version(db, uuid.uuid4()) is None
+
+
 async def test_cascade_delete(client):
     patient = await create_test_patient(client)
     pid = patient["id"]
@@ -94,9 +212,111 @@ async def test_cascade_delete(client):
 
     response = await client.delete(f"/api/patients/{pid}")
     assert response.status_code == 204
+    # The foreign key cascades to the notes; none are loaded or deleted
+    # one by one.
+    assert 'desc="1 queries"' in response.headers["server-timing"]
 
     response = await client.get(f"/api/patients/{pid}")
     assert response.status_code == 404
 
     response = await client.get(f"/api/patients/{pid}/notes")
     assert response.status_code == 404
+
+
+async def test_search_notes(client):
+    patient = await create_test_patient(client)
+    pid = patient["id"]
+    for content in [
+        "Patient reports persistent migraines in the morning",
+        "Blood pressure stable, continue current medication",
+    ]:
+        await client.post(
+            f"/api/patients/{pid}/notes",
+            json={"content": content, "timestamp": "2025-01-15T10:00:00Z"},
+        )
+
+    response = await client.get("/api/notes/search", params={"q": "migraine"})
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 1
+    assert results[0]["patient_id"] == pid
+    assert "<mark>migraines</mark>" in results[0]["snippet"]
+    assert results[0]["rank"] > 0
+
+
+async def test_search_notes_snippet_is_escaped(client):
+    patient = await create_test_patient(client)
+    await client.post(
+        f"/api/patients/{patient['id']}/notes",
+        json={
+            "content": "Migraine <script>alert(1)</script> <img src=x onerror=alert(2)>",
+            "timestamp": "2025-01-15T10:00:00Z",
+        },
+    )
+
+    response = await client.get("/api/notes/search", params={"q": "migraine"})
+    snippet = response.json()[0]["snippet"]
+    assert "<mark>Migraine</mark>" in snippet
+    assert "<script>" not in snippet
+    assert "<img" not in snippet
+
+    highlighted = note_service._highlight("\x02Migraine\x03 <script>")
+    assert highlighted == "<mark>Migraine</mark> &lt;script&gt;"
+
+
+async def test_search_notes_filters(client):
+    active = await create_test_patient(client, email="a@example.com")
+    critical = await create_test_patient(
+        client, email="c@example.com", status="critical"
+    )
+    for patient, timestamp in [
+        (active, "2025-01-10T10:00:00Z"),
+        (critical, "2025-03-10T10:00:00Z"),
+    ]:
+        await client.post(
+            f"/api/patients/{patient['id']}/notes",
+            json={"content": "Wound healing well", "timestamp": timestamp},
+        )
+
+    response = await client.get(
+        "/api/notes/search", params={"q": "wound", "status": "critical"}
+    )
+    assert [r["patient_id"] for r in response.json()] == [critical["id"]]
+
+    response = await client.get(
+        "/api/notes/search", params={"q": "wound", "patient_id": active["id"]}
+    )
+    assert [r["patient_id"] for r in response.json()] == [active["id"]]
+
+    response = await client.get(
+        "/api/notes/search",
+        params={"q": "wound", "from": "2025-02-01T00:00:00Z"},
+    )
+    assert [r["patient_id"] for r in response.json()] == [critical["id"]]
+
+
+async def test_search_notes_requires_query(client):
+    response = await client.get("/api/notes/search")
+    assert response.status_code == 422
+
+
+async def test_export_notes(client):
+    patient = await create_test_patient(client)
+    other = await create_test_patient(client, email="other@example.com")
+    await create_test_note(client, patient["id"])
+    await create_test_note(client, other["id"])
+
+    response = await client.get("/api/notes/export")
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+
+    response = await client.get(
+        f"/api/notes/export?format=csv&patient_id={patient['id']}"
+    )
+    header, *lines = response.text.splitlines()
+    assert header == "id,patient_id,timestamp,content,created_at"
+    assert len(lines) == 1
+    assert patient["id"] in lines[0]
+
+    response = await client.get("/api/notes/export?format=xml")
+    assert response.status_code == 422
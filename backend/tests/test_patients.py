@@ -1,6 +1,15 @@
+import asyncio
+import json
 import uuid
 
-from tests.conftest import create_test_patient
+from sqlalchemy import delete, select
+
+from app.models.summary import SummaryJob
+from app.responses import ORJSONResponse, dump_attributes
+from app.schemas.patient import PatientCreate, PatientResponse
+from app.services import patient_service
+from app.services.pagination import encode_cursor
+from tests.conftest import TestSessionLocal, create_test_patient
 
 
 async def test_create_patient(client):
@@ -35,6 +44,27 @@ async def test_create_patient_invalid_email(client):
     assert response.status_code == 422
 
 
+async def test_create_patient_single_statement(client):
+    response = await client.post(
+        "/api/patients",
+        json={
+            "first_name": "Test",
+            "last_name": "Patient",
+            "date_of_birth": "1990-01-15",
+            "gender": "Female",
+            "email": "test@example.com",
+            "phone": "555-0100",
+            "address": "123 Test St",
+        },
+    )
+    assert response.status_code == 201
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+    data = response.json()
+    assert data["status"] == "active"
+    assert data["allergies"] == []
+    assert data["created_at"] == data["updated_at"]
+
+
 async def test_list_patients_empty(client):
     response = await client.get("/api/patients")
     assert response.status_code == 200
@@ -90,6 +120,24 @@ async def test_get_patient(client):
     assert data["first_name"] == "Test"
 
 
+async def test_get_patient_etag(client):
+    patient = await create_test_patient(client)
+    url = f"/api/patients/{patient['id']}"
+
+    response = await client.get(url)
+    etag = response.headers["etag"]
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    await client.put(url, json={**patient, "first_name": "Changed"})
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Changed"
+    assert response.headers["etag"] != etag
+
+
 async def test_get_patient_not_found(client):
     response = await client.get(f"/api/patients/{uuid.uuid4()}")
     assert response.status_code == 404
@@ -109,6 +157,7 @@ async def test_update_patient(client):
     }
     response = await client.put(f"/api/patients/{patient['id']}", json=update_data)
     assert response.status_code == 200
+    assert 'desc="1 queries"' in response.headers["server-timing"]
     data = response.json()
     assert data["first_name"] == "Updated"
     assert data["last_name"] == "Name"
@@ -129,6 +178,79 @@ async def test_update_patient_not_found(client):
     assert response.status_code == 404
 
 
+async def test_patch_patient_writes_only_given_fields(client):
+    patient = await create_test_patient(client, allergies=["latex"])
+    url = f"/api/patients/{patient['id']}"
+
+    response = await client.patch(url, json={"status": "critical"})
+    assert response.status_code == 200
+    # The update, RETURNING and summary job upsert are one statement.
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+    data = response.json()
+    assert data["status"] == "critical"
+    assert data["allergies"] == ["latex"]
+    assert data["first_name"] == patient["first_name"]
+    assert data["updated_at"] > patient["updated_at"]
+    assert (await client.get(url)).json() == data
+
+    response = await client.patch(url, json={"blood_type": "O+", "allergies": []})
+    assert response.json()["blood_type"] == "O+"
+    assert response.json()["allergies"] == []
+    assert response.json()["status"] == "critical"
+
+
+async def test_patch_patient_explicit_null(client):
+    patient = await create_test_patient(
+        client, blood_type="A+", last_visit_date="2025-01-10T09:00:00Z"
+    )
+    url = f"/api/patients/{patient['id']}"
+
+    response = await client.patch(
+        url, json={"blood_type": None, "last_visit_date": None}
+    )
+    assert response.status_code == 200
+    assert response.json()["blood_type"] is None
+    assert response.json()["last_visit_date"] is None
+
+    for field in ("status", "allergies", "conditions", "email", "date_of_birth"):
+        response = await client.patch(url, json={field: None})
+        assert response.status_code == 422, field
+        assert response.json()["detail"][0]["loc"] == ["body", field]
+
+
+async def test_patch_patient_queues_summary_job(client):
+    patient = await create_test_patient(client)
+    async with TestSessionLocal() as db:
+        await db.execute(delete(SummaryJob))
+        await db.commit()
+
+    await client.patch(f"/api/patients/{patient['id']}", json={"status": "inactive"})
+    async with TestSessionLocal() as db:
+        jobs = (await db.execute(select(SummaryJob.patient_id))).scalars().all()
+    assert [str(j) for j in jobs] == [patient["id"]]
+
+
+async def test_patch_patient_validation(client):
+    patient = await create_test_patient(client)
+    url = f"/api/patients/{patient['id']}"
+
+    for body in (
+        {"first_name": None},
+        {"email": "not-an-email"},
+        {"date_of_birth": "2999-01-01"},
+        {"status": "unknown"},
+    ):
+        response = await client.patch(url, json=body)
+        assert response.status_code == 422, body
+
+    response = await client.patch(url, json={})
+    assert response.status_code == 200
+    assert response.json()["updated_at"] == patient["updated_at"]
+
+    response = await client.patch(f"/api/patients/{uuid.uuid4()}", json={"gender": "X"})
+    assert response.status_code == 404
+
+
 async def test_delete_patient(client):
     patient = await create_test_patient(client)
 
@@ -183,3 +305,368 @@ async def test_search_wildcard_escaping(client):
     data = response.json()
     assert data["total"] == 1
     assert data["items"][0]["first_name"] == "Test%User"
+
+
+async def test_orjson_rows_match_pydantic_serialization(client):
+    patient = await create_test_patient(client, allergies=[], conditions=[])
+    async with TestSessionLocal() as db:
+        row = await patient_service.get_patient(db, uuid.UUID(patient["id"]))
+    assert row.blood_type is None
+    assert row.last_visit_date is None
+
+    body = ORJSONResponse(dump_attributes(row, PatientResponse)).body
+    validated = PatientResponse.model_validate(row)
+    assert json.loads(body) == validated.model_dump(mode="json")
+    assert body == validated.model_dump_json().encode()
+
+
+async def test_list_patients_cursor_pagination(client):
+    for name in ["Alice", "Bob", "Charlie", "Dana", "Eve"]:
+        await create_test_patient(client, first_name=name, email=f"{name}@example.com")
+
+    params = {"sort_by": "first_name", "limit": 2}
+    response = await client.get("/api/patients", params=params)
+    page1 = response.json()
+    assert [p["first_name"] for p in page1["items"]] == ["Alice", "Bob"]
+    assert page1["prev_cursor"] is None
+    assert page1["next_cursor"]
+
+    response = await client.get(
+        "/api/patients", params={**params, "after": page1["next_cursor"]}
+    )
+    page2 = response.json()
+    assert [p["first_name"] for p in page2["items"]] == ["Charlie", "Dana"]
+    assert page2["total"] == 5
+
+    response = await client.get(
+        "/api/patients", params={**params, "after": page2["next_cursor"]}
+    )
+    page3 = response.json()
+    assert [p["first_name"] for p in page3["items"]] == ["Eve"]
+    assert page3["next_cursor"] is None
+
+    response = await client.get(
+        "/api/patients", params={**params, "before": page3["prev_cursor"]}
+    )
+    assert [p["first_name"] for p in response.json()["items"]] == ["Charlie", "Dana"]
+
+
+async def test_list_patients_cursor_desc_with_ties(client):
+    for i in range(4):
+        await create_test_patient(client, email=f"tie{i}@example.com")
+
+    params = {"sort_by": "last_name", "sort_order": "desc", "limit": 3}
+    page1 = (await client.get("/api/patients", params=params)).json()
+    page2 = (
+        await client.get(
+            "/api/patients", params={**params, "after": page1["next_cursor"]}
+        )
+    ).json()
+    ids = [p["id"] for p in page1["items"] + page2["items"]]
+    assert len(ids) == 4
+    assert len(set(ids)) == 4
+
+
+async def test_list_patients_cursor_nullable_column(client):
+    await create_test_patient(
+        client, email="v1@example.com", last_visit_date="2025-01-01T10:00:00Z"
+    )
+    await create_test_patient(client, email="none1@example.com")
+    await create_test_patient(
+        client, email="v2@example.com", last_visit_date="2025-02-01T10:00:00Z"
+    )
+    await create_test_patient(client, email="none2@example.com")
+
+    for sort_order in ("asc", "desc"):
+        params = {"sort_by": "last_visit_date", "sort_order": sort_order, "limit": 1}
+        seen = []
+        cursor = None
+        while True:
+            extra = {"after": cursor} if cursor else {}
+            data = (
+                await client.get("/api/patients", params={**params, **extra})
+            ).json()
+            seen.extend(p["email"] for p in data["items"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        offset_page = (
+            await client.get(
+                "/api/patients",
+                params={"sort_by": "last_visit_date", "sort_order": sort_order},
+            )
+        ).json()
+        assert seen == [p["email"] for p in offset_page["items"]]
+
+
+async def test_list_patients_invalid_cursor(client):
+    response = await client.get("/api/patients", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_list_patients_cursor_with_non_string_id(client):
+    for bad_id in (5, ["a"], None):
+        cursor = encode_cursor({"s": "last_name", "o": "asc", "v": "A", "id": bad_id})
+        response = await client.get("/api/patients", params={"after": cursor})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+
+async def test_list_patients_cursor_sort_mismatch(client):
+    for i in range(2):
+        await create_test_patient(client, email=f"m{i}@example.com")
+    page = (await client.get("/api/patients", params={"limit": 1})).json()
+
+    response = await client.get(
+        "/api/patients",
+        params={"sort_by": "first_name", "after": page["next_cursor"]},
+    )
+    assert response.status_code == 400
+
+
+async def test_search_matches_email_and_full_name(client):
+    await create_test_patient(
+        client, first_name="Alice", last_name="Wonderland", email="alice@example.com"
+    )
+    await create_test_patient(
+        client, first_name="Bob", last_name="Builder", email="builder@site.org"
+    )
+
+    response = await client.get("/api/patients", params={"search": "site.org"})
+    assert [p["first_name"] for p in response.json()["items"]] == ["Bob"]
+
+    response = await client.get("/api/patients", params={"search": "alice wonder"})
+    assert [p["first_name"] for p in response.json()["items"]] == ["Alice"]
+
+
+async def test_search_reflects_updates(client):
+    patient = await create_test_patient(client, first_name="Original")
+    update = {**patient, "first_name": "Renamed"}
+    for key in ("id", "created_at", "updated_at"):
+        update.pop(key)
+    await client.put(f"/api/patients/{patient['id']}", json=update)
+
+    response = await client.get("/api/patients", params={"search": "renamed"})
+    assert response.json()["total"] == 1
+    response = await client.get("/api/patients", params={"search": "original"})
+    assert response.json()["total"] == 0
+
+
+async def test_search_relevance_sort(client):
+    await create_test_patient(
+        client, first_name="Anna", last_name="Smithson", email="a@example.com"
+    )
+    await create_test_patient(
+        client, first_name="John", last_name="Smith", email="smith@example.com"
+    )
+
+    response = await client.get(
+        "/api/patients", params={"search": "smith", "sort_by": "relevance"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert data["items"][0]["first_name"] == "John"
+
+
+async def test_relevance_sort_requires_search(client):
+    response = await client.get("/api/patients", params={"sort_by": "relevance"})
+    assert response.status_code == 400
+
+
+async def test_patient_stats(client):
+    response = await client.get("/api/patients/stats")
+    assert response.status_code == 200
+    assert response.json() == {"total": 0, "active": 0, "inactive": 0, "critical": 0}
+
+    await create_test_patient(client, status="active", email="a@example.com")
+    await create_test_patient(client, status="critical", email="c1@example.com")
+    patient = await create_test_patient(
+        client, status="critical", email="c2@example.com"
+    )
+
+    response = await client.get("/api/patients/stats")
+    assert response.json() == {"total": 3, "active": 1, "inactive": 0, "critical": 2}
+
+    await client.delete(f"/api/patients/{patient['id']}")
+    response = await client.get("/api/patients/stats")
+    assert response.json() == {"total": 2, "active": 1, "inactive": 0, "critical": 1}
+
+
+async def test_list_patients_without_total(client):
+    await create_test_patient(client)
+
+    response = await client.get("/api/patients", params={"include_total": "false"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] is None
+    assert len(data["items"]) == 1
+
+
+async def test_list_patients_window_total(client):
+    for i in range(3):
+        await create_test_patient(client, email=f"w{i}@example.com", status="critical")
+    await create_test_patient(client, email="other@example.com")
+
+    params = {"total_mode": "window", "status": "critical", "limit": 2}
+    data = (await client.get("/api/patients", params=params)).json()
+    assert len(data["items"]) == 2
+    assert data["total"] == 3
+    assert data["total_is_estimate"] is False
+
+    data = (await client.get("/api/patients", params={**params, "offset": 10})).json()
+    assert data["items"] == []
+    assert data["total"] == 3
+
+
+async def test_list_patients_etag_tracks_table_version(client):
+    await create_test_patient(client)
+    url = "/api/patients?limit=5&sort_by=first_name"
+
+    etag = (await client.get(url)).headers["etag"]
+    response = await client.get(url, headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    # Other query parameters are a different representation.
+    response = await client.get(url + "&offset=1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    await create_test_patient(client, first_name="Another")
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+
+
+async def test_list_patients_estimated_total(client):
+    await create_test_patient(client)
+
+    for params in ({}, {"status": "active"}, {"search": "test"}):
+        response = await client.get(
+            "/api/patients", params={**params, "total_mode": "estimate"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_is_estimate"] is True
+        assert data["total"] >= 0
+
+
+async def test_list_patients_invalid_total_mode(client):
+    response = await client.get("/api/patients", params={"total_mode": "guess"})
+    assert response.status_code == 422
+
+
+def _bulk_row(i, **overrides):
+    return {
+        "first_name": f"Bulk{i}",
+        "last_name": "Import",
+        "date_of_birth": "1980-05-01",
+        "gender": "Male",
+        "email": f"bulk{i}@example.com",
+        "phone": "555-0199",
+        "address": "1 Import Way",
+        "allergies": ["Penicillin"],
+        **overrides,
+    }
+
+
+async def test_bulk_import_json_array(client):
+    rows = [_bulk_row(i) for i in range(3)]
+    response = await client.post("/api/patients/bulk", json=rows)
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 3, "errors": []}
+
+    listed = (await client.get("/api/patients?search=Bulk1")).json()
+    assert listed["total"] == 1
+    assert listed["items"][0]["allergies"] == ["Penicillin"]
+    stats = (await client.get("/api/patients/stats")).json()
+    assert stats["total"] == 3
+
+
+async def test_bulk_import_ndjson_skip_invalid(client):
+    lines = [
+        json.dumps(_bulk_row(0)),
+        "",
+        json.dumps(_bulk_row(1, email="not-an-email")),
+        "{not json",
+        json.dumps(_bulk_row(2)),
+    ]
+    response = await client.post(
+        "/api/patients/bulk?mode=skip_invalid",
+        content="\n".join(lines) + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["inserted"] == 2
+    assert [e["index"] for e in data["errors"]] == [1, 2]
+    assert data["errors"][0]["errors"][0]["loc"] == ["email"]
+    assert data["errors"][1]["errors"][0]["type"] == "json_invalid"
+
+
+async def test_bulk_import_all_or_nothing_rolls_back(client, monkeypatch):
+    monkeypatch.setattr("app.services.patient_service.BULK_CHUNK_SIZE", 2)
+    rows = [_bulk_row(i) for i in range(5)]
+    rows[4]["date_of_birth"] = "2999-01-01"
+
+    response = await client.post("/api/patients/bulk", json=rows)
+    assert response.status_code == 422
+    assert [e["index"] for e in response.json()["detail"]] == [4]
+
+    listed = (await client.get("/api/patients")).json()
+    assert listed["total"] == 0
+
+
+async def test_open_bulk_import_does_not_block_other_writes(client):
+    await create_test_patient(client)
+
+    async with TestSessionLocal() as import_db:
+        await patient_service.copy_patients(
+            import_db, [PatientCreate.model_validate(_bulk_row(0))]
+        )
+        # The import's transaction holds a table version slot until it
+        # commits; a concurrent write must take another one.
+        await asyncio.wait_for(
+            create_test_patient(client, email="concurrent@example.com"), timeout=5
+        )
+        etag = (await client.get("/api/patients")).headers["etag"]
+        await import_db.commit()
+
+    response = await client.get("/api/patients", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["total"] == 3
+
+
+async def test_bulk_import_rejects_non_array(client):
+    response = await client.post("/api/patients/bulk", json={"rows": []})
+    assert response.status_code == 400
+
+
+async def test_export_patients_ndjson(client, monkeypatch):
+    monkeypatch.setattr("app.services.patient_service.EXPORT_BATCH_SIZE", 2)
+    await client.post("/api/patients/bulk", json=[_bulk_row(i) for i in range(5)])
+    await create_test_patient(client, status="critical")
+
+    response = await client.get("/api/patients/export?status=active")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 5
+    assert rows[0]["allergies"] == ["Penicillin"]
+    assert rows[0]["date_of_birth"] == "1980-05-01"
+    uuid.UUID(rows[0]["id"])
+
+
+async def test_export_patients_csv(client):
+    await create_test_patient(client, allergies=["Latex", "Peanuts"])
+    await create_test_patient(client, first_name="Other", email="o@example.com")
+
+    response = await client.get("/api/patients/export?format=csv&search=Other")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="patients.csv"' in response.headers["content-disposition"]
+    header, *lines = response.text.splitlines()
+    assert header.startswith("id,first_name,last_name")
+    assert len(lines) == 1
+    assert ",Other," in lines[0]
+
+    response = await client.get("/api/patients/export?format=csv&search=Test")
+    assert "Latex; Peanuts" in response.text
@@ -0,0 +1,21 @@
+from app.schemas.patient import PatientCreate
+from app.seed import SyntheticData
+from app.services.patient_service import COPY_COLUMNS
+
+
+def test_synthetic_data_is_deterministic():
+    first = list(SyntheticData(seed=7, notes_per_patient=3).batches(50, 20))
+    second = list(SyntheticData(seed=7, notes_per_patient=3).batches(50, 20))
+    other = list(SyntheticData(seed=8, notes_per_patient=3).batches(50, 20))
+
+    assert first == second
+    assert first != other
+    assert [len(patients) for patients, _ in first] == [20, 20, 10]
+
+
+def test_synthetic_patients_are_valid():
+    for patients, notes in SyntheticData(seed=1, notes_per_patient=2).batches(100, 100):
+        for row in patients:
+            PatientCreate.model_validate(dict(zip(COPY_COLUMNS[1:], row[1:])))
+        patient_ids = {row[0] for row in patients}
+        assert all(note[1] in patient_ids for note in notes)
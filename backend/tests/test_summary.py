@@ -1,7 +1,19 @@
+import asyncio
+import json
 import uuid
 from unittest.mock import patch
 
-from tests.conftest import create_test_patient
+import httpx
+import openai
+from sqlalchemy import func, select, update
+
+from app.metrics import SUMMARY_GENERATIONS
+from app.models.summary import SummaryJob
+from app.schemas.summary import PatientSummary
+from app.services import note_service, summary_store
+from app.services.summary_service import generate_summary, summary_cache_stats
+from app.services.summary_worker import process_summary_jobs
+from tests.conftest import TestSessionLocal, create_test_patient, engine
 
 
 @patch("app.services.summary_service.settings")
@@ -40,6 +52,621 @@ async def test_summary_with_notes(mock_settings, client):
     assert "improvement" in data["summary"]
 
 
+@patch("app.services.summary_service.settings")
+async def test_summary_counts_notes_beyond_loaded_ones(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "template"
+    mock_settings.OPENROUTER_API_KEY = ""
+    patient = await create_test_patient(client)
+    pid = patient["id"]
+    for day in range(1, 8):
+        await client.post(
+            f"/api/patients/{pid}/notes",
+            json={"content": f"Visit {day}", "timestamp": f"2025-01-0{day}T10:00:00Z"},
+        )
+
+    response = await client.get(f"/api/patients/{pid}/summary")
+    summary = response.json()["summary"]
+    assert "Visit 7" in summary
+    assert "Visit 6" in summary
+    assert "Visit 5" not in summary
+    assert "5 additional earlier notes on file." in summary
+
+
+async def test_get_summary_inputs(client):
+    with_notes = await create_test_patient(client)
+    without_notes = await create_test_patient(client, email="other@example.com")
+    for day in range(1, 8):
+        await client.post(
+            f"/api/patients/{with_notes['id']}/notes",
+            json={"content": f"Visit {day}", "timestamp": f"2025-01-0{day}T10:00:00Z"},
+        )
+    missing = uuid.uuid4()
+
+    async with TestSessionLocal() as db:
+        inputs = await note_service.get_summary_inputs(
+            db,
+            [uuid.UUID(with_notes["id"]), uuid.UUID(without_notes["id"]), missing],
+            limit=3,
+        )
+
+    assert missing not in inputs
+    patient, notes, note_count = inputs[uuid.UUID(with_notes["id"])]
+    assert patient.first_name == "Test"
+    assert [n.content for n in notes] == ["Visit 7", "Visit 6", "Visit 5"]
+    assert note_count == 7
+    _, notes, note_count = inputs[uuid.UUID(without_notes["id"])]
+    assert notes == []
+    assert note_count == 0
+
+
 async def test_summary_not_found(client):
     response = await client.get(f"/api/patients/{uuid.uuid4()}/summary")
     assert response.status_code == 404
+
+
+@patch("app.services.summary_service.settings")
+async def test_summary_served_from_store_until_regenerated(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "template"
+    mock_settings.OPENROUTER_API_KEY = ""
+    mock_settings.SUMMARY_BATCH_CONCURRENCY = 2
+    patient = await create_test_patient(client)
+    pid = patient["id"]
+
+    first = (await client.get(f"/api/patients/{pid}/summary")).json()
+    second = (await client.get(f"/api/patients/{pid}/summary")).json()
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["stale"] is False
+    assert second["generated_at"] is not None
+    assert second["summary"] == first["summary"]
+
+    await client.post(
+        f"/api/patients/{pid}/notes",
+        json={"content": "New finding recorded", "timestamp": "2025-02-01T10:00:00Z"},
+    )
+    third = (await client.get(f"/api/patients/{pid}/summary")).json()
+    assert third["stale"] is True
+    assert third["summary"] == first["summary"]
+
+    assert await process_summary_jobs(TestSessionLocal) == 1
+    fourth = (await client.get(f"/api/patients/{pid}/summary")).json()
+    assert fourth["stale"] is False
+    assert "New finding" in fourth["summary"]
+    assert await process_summary_jobs(TestSessionLocal) == 0
+
+
+@patch("app.services.summary_service.settings")
+async def test_patient_update_queues_summary_regeneration(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "template"
+    mock_settings.OPENROUTER_API_KEY = ""
+    mock_settings.SUMMARY_BATCH_CONCURRENCY = 2
+    patient = await create_test_patient(client)
+    pid = patient["id"]
+    await client.get(f"/api/patients/{pid}/summary")
+
+    update = {**patient, "first_name": "Renamed"}
+    for key in ("id", "created_at", "updated_at"):
+        update.pop(key)
+    await client.put(f"/api/patients/{pid}", json=update)
+    assert (await client.get(f"/api/patients/{pid}/summary")).json()["stale"] is True
+
+    await process_summary_jobs(TestSessionLocal)
+    data = (await client.get(f"/api/patients/{pid}/summary")).json()
+    assert data["stale"] is False
+    assert "Renamed" in data["summary"]
+
+
+@patch("app.services.summary_service.settings")
+async def test_summary_stream_reads_through_store(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "template"
+    mock_settings.OPENROUTER_API_KEY = ""
+    mock_settings.SUMMARY_BATCH_CONCURRENCY = 2
+    patient = await create_test_patient(client)
+    pid = patient["id"]
+    url = f"/api/patients/{pid}/summary/stream"
+
+    assert parse_sse((await client.get(url)).text)[-1][1]["cached"] is False
+    events = parse_sse((await client.get(url)).text)
+    assert [event for event, _ in events] == ["done"]
+    assert events[0][1]["cached"] is True
+    assert events[0][1]["generated_at"] is not None
+
+    await client.post(
+        f"/api/patients/{pid}/notes",
+        json={"content": "New finding recorded", "timestamp": "2025-02-01T10:00:00Z"},
+    )
+    done = parse_sse((await client.get(url)).text)[-1][1]
+    assert done["stale"] is True
+    assert "New finding" not in done["summary"]
+
+    await process_summary_jobs(TestSessionLocal)
+    done = parse_sse((await client.get(url)).text)[-1][1]
+    assert done["stale"] is False
+    assert "New finding" in done["summary"]
+
+
+@patch("app.services.summary_service.settings")
+async def test_batch_summaries(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "template"
+    mock_settings.OPENROUTER_API_KEY = ""
+    mock_settings.SUMMARY_BATCH_CONCURRENCY = 2
+    alice = await create_test_patient(client, first_name="Alice")
+    bob = await create_test_patient(client, first_name="Bob")
+    missing = str(uuid.uuid4())
+
+    response = await client.post(
+        "/api/patients/summaries",
+        json={"patient_ids": [alice["id"], bob["id"], missing, alice["id"]]},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    items = {
+        item["patient_id"]: item
+        for item in map(json.loads, response.text.strip().splitlines())
+    }
+    assert len(items) == 3
+    assert "Alice" in items[alice["id"]]["summary"]["summary"]
+    assert "Bob" in items[bob["id"]]["summary"]["summary"]
+    assert items[missing]["error"] == "Patient not found"
+    assert items[missing]["summary"] is None
+
+
+async def test_batch_summaries_validation(client):
+    response = await client.post("/api/patients/summaries", json={"patient_ids": []})
+    assert response.status_code == 422
+
+
+@patch("app.services.summary_service.settings")
+async def test_batch_summaries_fall_back_per_patient(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    mock_settings.SUMMARY_BATCH_CONCURRENCY = 4
+    alice = await create_test_patient(client, first_name="Alice")
+    bob = await create_test_patient(client, first_name="Bob")
+
+    async def fake_llm(patient, notes):
+        if patient.first_name == "Bob":
+            raise ValueError("LLM returned empty content")
+        return f"LLM summary for {patient.first_name}"
+
+    with patch("app.services.summary_service.generate_llm_summary", fake_llm):
+        response = await client.post(
+            "/api/patients/summaries",
+            json={"patient_ids": [alice["id"], bob["id"]]},
+        )
+    items = {
+        item["patient_id"]: item["summary"]
+        for item in map(json.loads, response.text.strip().splitlines())
+    }
+    assert items[alice["id"]]["summary"] == "LLM summary for Alice"
+    assert items[alice["id"]]["mode"] == "llm"
+    assert items[bob["id"]]["mode"] == "template"
+
+
+@patch("app.services.summary_service.settings")
+async def test_summary_generation_holds_no_connection(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    mock_settings.SUMMARY_BATCH_CONCURRENCY = 2
+    alice = await create_test_patient(client, first_name="Alice")
+    bob = await create_test_patient(client, first_name="Bob")
+    checked_out = []
+
+    async def fake_llm(patient, notes):
+        checked_out.append(engine.pool.checkedout())
+        return f"LLM summary for {patient.first_name}"
+
+    with patch("app.services.summary_service.generate_llm_summary", fake_llm):
+        await client.get(f"/api/patients/{alice['id']}/summary")
+        await client.post("/api/patients/summaries", json={"patient_ids": [bob["id"]]})
+    assert checked_out == [0, 0]
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@patch("app.services.summary_service.settings")
+async def test_summary_stream_template_mode(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "template"
+    mock_settings.OPENROUTER_API_KEY = ""
+    patient = await create_test_patient(client)
+
+    response = await client.get(f"/api/patients/{patient['id']}/summary/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [event for event, _ in events] == ["done"]
+    assert events[0][1]["mode"] == "template"
+
+
+@patch("app.services.summary_service.settings")
+async def test_summary_stream_llm_deltas(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    patient = await create_test_patient(client)
+
+    async def fake_stream(patient, notes):
+        for piece in ["Stable ", "patient."]:
+            yield piece
+
+    with patch("app.services.summary_service.stream_llm_summary", fake_stream):
+        response = await client.get(f"/api/patients/{patient['id']}/summary/stream")
+    events = parse_sse(response.text)
+    assert events == [
+        ("delta", {"text": "Stable "}),
+        ("delta", {"text": "patient."}),
+        (
+            "done",
+            {
+                "summary": "Stable patient.",
+                "mode": "llm",
+                "cached": False,
+                "stale": False,
+                "generated_at": None,
+            },
+        ),
+    ]
+
+
+@patch("app.services.summary_service.settings")
+async def test_summary_stream_falls_back_midway(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    patient = await create_test_patient(client)
+
+    async def failing_stream(patient, notes):
+        yield "Partial "
+        raise openai.APITimeoutError(request=httpx.Request("POST", "http://llm"))
+
+    with patch("app.services.summary_service.stream_llm_summary", failing_stream):
+        response = await client.get(f"/api/patients/{patient['id']}/summary/stream")
+    events = parse_sse(response.text)
+    assert [event for event, _ in events] == ["delta", "fallback", "done"]
+    assert events[-1][1]["mode"] == "template"
+
+
+@patch("app.services.summary_service.settings")
+async def test_streamed_summary_is_stored(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    patient = await create_test_patient(client)
+    calls = 0
+
+    async def fake_stream(patient, notes):
+        nonlocal calls
+        calls += 1
+        yield "Streamed summary"
+
+    with patch("app.services.summary_service.stream_llm_summary", fake_stream):
+        await client.get(f"/api/patients/{patient['id']}/summary/stream")
+
+    with patch("app.services.summary_service.stream_llm_summary", fake_stream):
+        response = await client.get(f"/api/patients/{patient['id']}/summary/stream")
+    assert calls == 1
+    assert parse_sse(response.text)[-1][1]["summary"] == "Streamed summary"
+    async with TestSessionLocal() as db:
+        stored = await summary_store.get_stored_summary(db, uuid.UUID(patient["id"]))
+    assert stored.summary == "Streamed summary"
+    assert stored.stale is False
+
+
+@patch("app.services.summary_service.settings")
+async def test_streamed_fallback_is_not_stored(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    pid = uuid.UUID((await create_test_patient(client))["id"])
+
+    async def failing_stream(patient, notes):
+        raise openai.APITimeoutError(request=httpx.Request("POST", "http://llm"))
+        yield
+
+    with patch("app.services.summary_service.stream_llm_summary", failing_stream):
+        response = await client.get(f"/api/patients/{pid}/summary/stream")
+    assert parse_sse(response.text)[-1][1]["mode"] == "template"
+    async with TestSessionLocal() as db:
+        assert await summary_store.get_stored_summary(db, pid) is None
+        # The lease was released, so the next view can retry the LLM.
+        assert await summary_store.claim_summary_generation(db, pid, 30) is not None
+
+
+async def test_summary_stream_not_found(client):
+    response = await client.get(f"/api/patients/{uuid.uuid4()}/summary/stream")
+    assert response.status_code == 404
+
+
+@patch("app.services.summary_service.settings")
+async def test_concurrent_summaries_share_one_llm_call(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    patient = await create_test_patient(client)
+    calls = 0
+
+    async def slow_llm(patient, notes):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return "Shared summary"
+
+    with patch("app.services.summary_service.generate_llm_summary", slow_llm):
+        responses = await asyncio.gather(
+            *(client.get(f"/api/patients/{patient['id']}/summary") for _ in range(3))
+        )
+    assert calls == 1
+    assert all(r.json()["summary"] == "Shared summary" for r in responses)
+
+
+@patch("app.services.summary_service.settings")
+async def test_in_process_generations_are_coalesced(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    pid = uuid.UUID((await create_test_patient(client))["id"])
+    async with TestSessionLocal() as db:
+        inputs = await note_service.get_summary_inputs(db, [pid])
+    calls = 0
+
+    async def slow_llm(patient, notes):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return "Shared summary"
+
+    with patch("app.services.summary_service.generate_llm_summary", slow_llm):
+        summaries = await asyncio.gather(
+            *(generate_summary(*inputs[pid]) for _ in range(3))
+        )
+    assert calls == 1
+    assert {summary.summary for summary in summaries} == {"Shared summary"}
+    assert summary_cache_stats()["coalesced"] == 2
+    metrics = (await client.get("/api/metrics")).text
+    assert 'summary_cache_requests_total{result="coalesced"} 2.0' in metrics
+
+
+@patch("app.services.summary_service.settings")
+async def test_summary_miss_waits_for_generation_leased_elsewhere(
+    mock_settings, client
+):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    pid = uuid.UUID((await create_test_patient(client))["id"])
+    calls = 0
+
+    async def counting_llm(patient, notes):
+        nonlocal calls
+        calls += 1
+        return "Generated here"
+
+    # Stands in for another worker process that leased the generation first.
+    async with TestSessionLocal() as other:
+        lease = await summary_store.claim_summary_generation(other, pid, 30)
+        await other.commit()
+        assert lease is not None
+        assert await summary_store.claim_summary_generation(other, pid, 30) is None
+        await other.commit()
+
+        async def finish_elsewhere():
+            await asyncio.sleep(0.3)
+            summary = PatientSummary(summary="Generated elsewhere", mode="llm")
+            await summary_store.save_summary(other, pid, summary)
+            await summary_store.complete_summary_jobs(other, [(pid, lease)])
+            await other.commit()
+
+        with patch("app.services.summary_service.generate_llm_summary", counting_llm):
+            response, _ = await asyncio.gather(
+                client.get(f"/api/patients/{pid}/summary"), finish_elsewhere()
+            )
+    assert calls == 0
+    assert response.json()["summary"] == "Generated elsewhere"
+    assert response.json()["stale"] is False
+
+
+@patch("app.services.summary_service.settings")
+async def test_llm_latency_budget_falls_back(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 0.05
+    patient = await create_test_patient(client)
+
+    async def hanging_llm(patient, notes):
+        await asyncio.sleep(5)
+
+    fallbacks = SUMMARY_GENERATIONS.values.get(("fallback",), 0)
+    with patch("app.services.summary_service.generate_llm_summary", hanging_llm):
+        response = await client.get(f"/api/patients/{patient['id']}/summary")
+    assert response.json()["mode"] == "template"
+    assert SUMMARY_GENERATIONS.values[("fallback",)] == fallbacks + 1
+
+
+@patch("app.services.summary_service.settings")
+async def test_llm_stream_latency_budget_falls_back(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 0.05
+    patient = await create_test_patient(client)
+    url = f"/api/patients/{patient['id']}/summary/stream"
+
+    async def hanging_stream(patient, notes):
+        await asyncio.sleep(5)
+        yield "Too late"
+
+    async def stalling_stream(patient, notes):
+        yield "Partial "
+        await asyncio.sleep(5)
+        yield "too late"
+
+    fallbacks = SUMMARY_GENERATIONS.values.get(("fallback",), 0)
+    with patch("app.services.summary_service.stream_llm_summary", hanging_stream):
+        events = parse_sse((await client.get(url)).text)
+    assert events[0] == ("fallback", {"reason": "TimeoutError"})
+    assert events[-1][1]["mode"] == "template"
+
+    with patch("app.services.summary_service.stream_llm_summary", stalling_stream):
+        events = parse_sse((await client.get(url)).text)
+    assert [event for event, _ in events] == ["delta", "fallback", "done"]
+    assert SUMMARY_GENERATIONS.values[("fallback",)] == fallbacks + 2
+    assert (await client.get("/api/health/llm-breaker")).json()["window_failures"] == 2
+
+
+@patch("app.services.summary_service.settings")
+async def test_open_breaker_skips_llm(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    patient = await create_test_patient(client)
+    calls = 0
+
+    async def rate_limited(patient, notes):
+        nonlocal calls
+        calls += 1
+        response = httpx.Response(
+            429,
+            headers={"retry-after": "120"},
+            request=httpx.Request("POST", "http://llm"),
+        )
+        raise openai.RateLimitError("slow down", response=response, body=None)
+
+    with patch("app.services.summary_service.generate_llm_summary", rate_limited):
+        first = await client.get(f"/api/patients/{patient['id']}/summary")
+        second = await client.get(f"/api/patients/{patient['id']}/summary")
+    assert first.json()["mode"] == "template"
+    assert second.json()["mode"] == "template"
+    assert calls == 1
+
+    stats = (await client.get("/api/health/llm-breaker")).json()
+    assert stats["state"] == "open"
+    assert stats["transitions"] == {"closed->open": 1}
+
+    metrics = (await client.get("/api/metrics")).text
+    assert 'llm_breaker_state{state="open"} 1.0' in metrics
+    assert 'llm_breaker_state{state="closed"} 0.0' in metrics
+    assert 'llm_breaker_transitions_total{transition="closed->open"} 1.0' in metrics
+    assert "llm_breaker_rejected_total 1.0" in metrics
+
+
+async def test_summary_job_reenqueued_while_running_survives(client):
+    patient = await create_test_patient(client)
+    pid = uuid.UUID(patient["id"])
+
+    async with TestSessionLocal() as db:
+        await summary_store.enqueue_summary_job(db, pid)
+        await db.commit()
+        jobs = await summary_store.claim_summary_jobs(db, limit=10, lease_seconds=60)
+        await db.commit()
+        assert [job[0] for job in jobs] == [pid]
+        assert await summary_store.claim_summary_jobs(db, 10, 60) == []
+
+        await summary_store.enqueue_summary_job(db, pid)
+        await db.commit()
+        await summary_store.complete_summary_jobs(db, jobs)
+        await db.commit()
+
+        reclaimed = await summary_store.claim_summary_jobs(
+            db, limit=10, lease_seconds=60
+        )
+        assert [job[0] for job in reclaimed] == [pid]
+
+
+async def _failing_llm(patient, notes):
+    raise openai.APITimeoutError(request=httpx.Request("POST", "http://llm"))
+
+
+@patch("app.services.summary_service.settings")
+async def test_llm_fallback_is_not_stored(mock_settings, client):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    patient = await create_test_patient(client)
+    url = f"/api/patients/{patient['id']}/summary"
+
+    with patch("app.services.summary_service.generate_llm_summary", _failing_llm):
+        assert (await client.get(url)).json()["mode"] == "template"
+
+    async def healthy_llm(patient, notes):
+        return "Recovered summary"
+
+    with patch("app.services.summary_service.generate_llm_summary", healthy_llm):
+        data = (await client.get(url)).json()
+    assert data["mode"] == "llm"
+    assert data["cached"] is False
+    assert data["summary"] == "Recovered summary"
+
+
+async def _job_lease_seconds(pid: uuid.UUID) -> float:
+    async with TestSessionLocal() as db:
+        job = await db.get(SummaryJob, pid)
+        now = await db.scalar(select(func.clock_timestamp()))
+    return (job.locked_until - now).total_seconds()
+
+
+@patch("app.services.summary_worker.settings")
+@patch("app.services.summary_service.settings")
+async def test_worker_backs_off_after_max_attempts(
+    mock_settings, worker_settings, client
+):
+    mock_settings.SUMMARY_MODE = "llm"
+    mock_settings.OPENROUTER_API_KEY = "test-key"
+    mock_settings.LLM_LATENCY_BUDGET_SECONDS = 5
+    mock_settings.SUMMARY_BATCH_CONCURRENCY = 2
+    worker_settings.SUMMARY_WORKER_BATCH_SIZE = 10
+    worker_settings.SUMMARY_WORKER_LEASE_SECONDS = 0
+    worker_settings.SUMMARY_WORKER_MAX_ATTEMPTS = 2
+    worker_settings.SUMMARY_WORKER_BACKOFF_SECONDS = 60
+    worker_settings.SUMMARY_WORKER_MAX_BACKOFF_SECONDS = 90
+    patient = await create_test_patient(client)
+    pid = uuid.UUID(patient["id"])
+    async with TestSessionLocal() as db:
+        old = PatientSummary(summary="Old summary", mode="llm")
+        await summary_store.save_summary(db, pid, old)
+        await summary_store.enqueue_summary_job(db, pid)
+        await db.commit()
+
+    with patch("app.services.summary_service.generate_llm_summary", _failing_llm):
+        # Two retries at the lease interval, then the first backed-off claim.
+        assert await process_summary_jobs(TestSessionLocal) == 1
+        assert await process_summary_jobs(TestSessionLocal) == 1
+        assert await process_summary_jobs(TestSessionLocal) == 1
+        assert await process_summary_jobs(TestSessionLocal) == 0
+        assert 50 < await _job_lease_seconds(pid) <= 60
+
+        async with TestSessionLocal() as db:
+            await db.execute(
+                update(SummaryJob)
+                .where(SummaryJob.patient_id == pid)
+                .values(locked_until=func.clock_timestamp())
+            )
+            await db.commit()
+        assert await process_summary_jobs(TestSessionLocal) == 1
+        # Doubled to 120 s, capped at the 90 s maximum.
+        assert 80 < await _job_lease_seconds(pid) <= 90
+
+    # The job is still queued, so the old summary is still reported stale.
+    async with TestSessionLocal() as db:
+        stored = await summary_store.get_stored_summary(db, pid)
+    assert stored.summary == "Old summary"
+    assert stored.stale is True
+
+    async def healthy_llm(patient, notes):
+        return "Recovered summary"
+
+    async with TestSessionLocal() as db:
+        await summary_store.enqueue_summary_job(db, pid)
+        await db.commit()
+    with patch("app.services.summary_service.generate_llm_summary", healthy_llm):
+        assert await process_summary_jobs(TestSessionLocal) == 1
+    async with TestSessionLocal() as db:
+        stored = await summary_store.get_stored_summary(db, pid)
+    assert stored.mode == "llm"
+    assert stored.stale is False
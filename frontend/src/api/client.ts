@@ -2,10 +2,12 @@ import axios from 'axios';
 import type {
   Note,
   NoteFormData,
+  NotePage,
   PaginatedResponse,
   Patient,
   PatientFormData,
   PatientListParams,
+  PatientStats,
   PatientSummary,
 } from '../types/index.ts';
 
@@ -19,6 +21,10 @@ export function getPatients(params: PatientListParams): Promise<PaginatedRespons
   return client.get('/patients', { params });
 }
 
+export function getPatientStats(): Promise<PatientStats> {
+  return client.get('/patients/stats');
+}
+
 export function getPatient(id: string): Promise<Patient> {
   return client.get(`/patients/${id}`);
 }
@@ -43,8 +49,8 @@ export function deletePatient(id: string): Promise<void> {
   return client.delete(`/patients/${id}`);
 }
 
-export function getNotes(patientId: string): Promise<Note[]> {
-  return client.get(`/patients/${patientId}/notes`);
+export function getNotes(patientId: string, after?: string): Promise<NotePage> {
+  return client.get(`/patients/${patientId}/notes`, { params: { after } });
 }
 
 export function createNote(patientId: string, data: NoteFormData): Promise<Note> {
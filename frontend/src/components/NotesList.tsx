@@ -14,7 +14,17 @@ import { formatDateTime } from '../utils/format.ts';
 import { parseApiError } from '../utils/errors.ts';
 
 export default function NotesList({ patientId }: { patientId: string }) {
-  const { data: notes, isLoading, isError, error, refetch } = useNotes(patientId);
+  const {
+    data,
+    isLoading,
+    isError,
+    error,
+    refetch,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useNotes(patientId);
+  const notes = data?.pages.flatMap((page) => page.items);
   const deleteMutation = useDeleteNote(patientId);
   const [confirmId, setConfirmId] = useState<string | null>(null);
   const [deleteError, setDeleteError] = useState<string | null>(null);
@@ -108,6 +118,13 @@ export default function NotesList({ patientId }: { patientId: string }) {
           </Box>
         </Box>
       ))}
+      {hasNextPage && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 2 }}>
+          <Button size="small" disabled={isFetchingNextPage} onClick={() => fetchNextPage()}>
+            {isFetchingNextPage ? <CircularProgress size={16} /> : 'Load older notes'}
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 }
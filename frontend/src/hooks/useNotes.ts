@@ -1,11 +1,13 @@
-import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { createNote, deleteNote, getNotes } from '../api/client.ts';
 import type { NoteFormData } from '../types/index.ts';
 
 export function useNotes(patientId: string) {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ['notes', patientId],
-    queryFn: () => getNotes(patientId),
+    queryFn: ({ pageParam }) => getNotes(patientId, pageParam),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
   });
 }
 
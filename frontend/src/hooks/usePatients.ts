@@ -3,6 +3,7 @@ import {
   createPatient,
   deletePatient,
   getPatient,
+  getPatientStats,
   getPatients,
   updatePatient,
 } from '../api/client.ts';
@@ -15,6 +16,13 @@ export function usePatients(params: PatientListParams) {
   });
 }
 
+export function usePatientStats() {
+  return useQuery({
+    queryKey: ['patients', 'stats'],
+    queryFn: getPatientStats,
+  });
+}
+
 export function usePatient(id: string | undefined) {
   return useQuery({
     queryKey: ['patients', 'detail', id],
@@ -26,7 +26,7 @@ import WarningIcon from '@mui/icons-material/Warning';
 import ErrorIcon from '@mui/icons-material/Error';
 import AddIcon from '@mui/icons-material/Add';
 import ArrowForwardIcon from '@mui/icons-material/ArrowForward';
-import { usePatients } from '../hooks/usePatients.ts';
+import { usePatientStats, usePatients } from '../hooks/usePatients.ts';
 import { formatDate } from '../utils/format.ts';
 import { STATUS_COLORS } from '../utils/constants.ts';
 import type { PatientStatus } from '../types/index.ts';
@@ -133,18 +133,9 @@ export default function DashboardPage() {
   const theme = useTheme();
   const isMobile = useMediaQuery(theme.breakpoints.down('sm'));
 
-  const statQueries: Record<StatKey, ReturnType<typeof usePatients>> = {
-    total: usePatients({ limit: 1 }),
-    active: usePatients({ limit: 1, status: 'active' }),
-    critical: usePatients({ limit: 1, status: 'critical' }),
-    inactive: usePatients({ limit: 1, status: 'inactive' }),
-  };
+  const statsQuery = usePatientStats();
   const recentQuery = usePatients({ limit: 5, sort_by: 'last_visit_date', sort_order: 'desc' });
 
-  const statQueryList = Object.values(statQueries);
-  const anyStatError = statQueryList.some((q) => q.isError);
-  const anyStatLoading = statQueryList.some((q) => q.isLoading);
-
   return (
     <>
       <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mb: 3 }}>
@@ -159,16 +150,12 @@ export default function DashboardPage() {
       </Box>
 
       {/* Stat Cards */}
-      {anyStatError && !anyStatLoading && (
+      {statsQuery.isError && !statsQuery.isLoading && (
         <Alert
           severity="error"
           sx={{ mb: 2 }}
           action={
-            <Button
-              color="inherit"
-              size="small"
-              onClick={() => statQueryList.forEach((q) => q.refetch())}
-            >
+            <Button color="inherit" size="small" onClick={() => statsQuery.refetch()}>
               Retry
             </Button>
           }
@@ -178,22 +165,19 @@ export default function DashboardPage() {
       )}
 
       <Grid container spacing={2} sx={{ mb: 4 }}>
-        {STAT_CARDS.map((card) => {
-          const query = statQueries[card.key];
-          return (
-            <Grid key={card.key} size={{ xs: 12, sm: 6, md: 3 }}>
-              <StatCard
-                label={card.label}
-                count={query.data?.total}
-                colorKey={card.colorKey}
-                icon={card.icon}
-                isLoading={query.isLoading}
-                isError={query.isError}
-                onClick={() => navigate(card.path)}
-              />
-            </Grid>
-          );
-        })}
+        {STAT_CARDS.map((card) => (
+          <Grid key={card.key} size={{ xs: 12, sm: 6, md: 3 }}>
+            <StatCard
+              label={card.label}
+              count={statsQuery.data?.[card.key]}
+              colorKey={card.colorKey}
+              icon={card.icon}
+              isLoading={statsQuery.isLoading}
+              isError={statsQuery.isError}
+              onClick={() => navigate(card.path)}
+            />
+          </Grid>
+        ))}
       </Grid>
 
       {/* Recent Patients */}
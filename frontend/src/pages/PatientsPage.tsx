@@ -65,6 +65,16 @@ export default function PatientsPage() {
 
   const { data, isLoading, isFetching, isError, error, refetch } = usePatients(params);
 
+  // The API leaves total null when it skips the count; a short page is then
+  // the last one, otherwise MUI's -1 marks the count as unknown.
+  let paginationCount = -1;
+  if (data?.total != null) {
+    // An estimate can undershoot the rows actually on screen.
+    paginationCount = Math.max(data.total, page * rowsPerPage + data.items.length);
+  } else if (data && data.items.length < rowsPerPage) {
+    paginationCount = page * rowsPerPage + data.items.length;
+  }
+
   const handleSort = (column: SortableColumn) => {
     if (sortBy === column) {
       setSortOrder((prev) => (prev === 'asc' ? 'desc' : 'asc'));
@@ -247,10 +257,15 @@ export default function PatientsPage() {
           )}
         </TableContainer>
 
-        {data && data.total > 0 && (
+        {data && (page > 0 || data.items.length > 0) && (
           <TablePagination
             component="div"
-            count={data.total}
+            count={paginationCount}
+            labelDisplayedRows={({ from, to, count }) =>
+              count === -1
+                ? `${from}–${to} of more than ${to}`
+                : `${from}–${to} of ${data.total_is_estimate ? 'about ' : ''}${count}`
+            }
             page={page}
             onPageChange={(_, newPage) => setPage(newPage)}
             rowsPerPage={rowsPerPage}
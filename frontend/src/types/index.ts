@@ -18,14 +18,29 @@ export interface Patient {
 
 export interface PaginatedResponse<T> {
   items: T[];
-  total: number;
+  total: number | null;
+  total_is_estimate: boolean;
   limit: number;
   offset: number;
+  next_cursor: string | null;
+  prev_cursor: string | null;
 }
 
 export type PatientStatus = 'active' | 'inactive' | 'critical';
 
-export type SortableColumn = 'last_name' | 'date_of_birth' | 'status' | 'last_visit_date';
+export interface PatientStats {
+  total: number;
+  active: number;
+  inactive: number;
+  critical: number;
+}
+
+export type SortableColumn =
+  | 'last_name'
+  | 'date_of_birth'
+  | 'status'
+  | 'last_visit_date'
+  | 'relevance';
 
 export interface PatientFormData {
   first_name: string;
@@ -49,6 +64,8 @@ export interface PatientListParams {
   status?: PatientStatus;
   sort_by?: SortableColumn;
   sort_order?: 'asc' | 'desc';
+  after?: string;
+  before?: string;
 }
 
 export interface Note {
@@ -59,6 +76,11 @@ export interface Note {
   created_at: string;
 }
 
+export interface NotePage {
+  items: Note[];
+  next_cursor: string | null;
+}
+
 export interface NoteFormData {
   content: string;
   timestamp: string;
@@ -67,4 +89,7 @@ export interface NoteFormData {
 export interface PatientSummary {
   summary: string;
   mode: 'llm' | 'template';
+  cached: boolean;
+  stale: boolean;
+  generated_at: string | null;
 }